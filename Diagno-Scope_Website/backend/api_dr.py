@@ -1,112 +1,134 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
-import cv2
-import numpy as np
-import base64
-import io
-import uuid
-import pydicom
-import os
-from PIL import Image
-
-from blood import DRAnalyzer
-
-# ================= APP =================
-app = FastAPI(title="Diabetic Retinopathy Detection API")
-
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# ================= STORAGE =================
-results_db: Dict[str, dict] = {}
-
-# ================= MODEL =================
-print("⏳ Loading DR Engine...")
-dr_engine = DRAnalyzer(os.path.abspath("best_modeldensenet121.pth"))
-
-# ================= HELPERS =================
-def img_to_base64(img):
-    _, buffer = cv2.imencode(".png", cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
-    return base64.b64encode(buffer).decode("utf-8")
-
-def process_image_file(file_content: bytes, filename: str) -> np.ndarray:
-    try:
-        if filename.lower().endswith(".dcm"):
-            dicom_data = pydicom.dcmread(io.BytesIO(file_content))
-            img = dicom_data.pixel_array
-            if img.max() > 255:
-                img = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
-            img = img.astype(np.uint8)
-            if len(img.shape) == 2:
-                img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
-            return img
-        else:
-            return np.array(Image.open(io.BytesIO(file_content)).convert("RGB"))
-    except Exception as e:
-        print(f"Error processing file {filename}: {e}")
-        return None
-
-@app.post("/analyze")
-async def analyze(
-    analysis_type: str = Form(...),
-    files: List[UploadFile] = File(...)
-):
-    job_id = str(uuid.uuid4())
-    responses = []
-
-    for file in files:
-        img_bytes = await file.read()
-        img = process_image_file(img_bytes, file.filename)
-        
-        if img is None:
-            responses.append({
-                "filename": file.filename,
-                "error": "Could not process image"
-            })
-            continue
-
-        if analysis_type == "dr":
-            # Diabetic Retinopathy Logic
-            result = dr_engine.analyze(img)
-            
-            if "error" in result:
-                 responses.append({
-                    "filename": file.filename,
-                    "error": result["error"]
-                 })
-            else:
-                responses.append({
-                    "filename": file.filename,
-                    "detections_image": result.get('lesion_base64') or result.get('original_base64'),
-                    "confidence": result.get('confidence'),
-                    "method_used": f"DR AI: {result.get('prediction')}",
-                    "smart_mode": True,
-                    "dr_details": result 
-                })
-
-
-    results_db[job_id] = {
-        "status": "completed",
-        "analysis_type": analysis_type,
-        "results": responses
-    }
-
-    return {
-        "job_id": job_id,
-        "message": "Analysis complete. Use GET /result/{job_id} to fetch results."
-    }
-
-@app.get("/result/{job_id}")
-async def get_result(job_id: str):
-    if job_id not in results_db:
-        raise HTTPException(status_code=404, detail="Job ID not found")
-    
-    return results_db[job_id]
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+from typing import List, Dict, Optional
+import cv2
+import numpy as np
+import base64
+import io
+import uuid
+import functools
+import os
+from PIL import Image
+
+from dicom_io import spool_upload
+from image_io import process_image_file, request_encoding
+from workers import inference_pool, PoolOverloaded, overload_handler
+from jobs import JobRunner
+from result_store import ResultStore
+from artifact_store import ArtifactStore
+from inference_cache import InferenceCache
+from config import RESULT_STORE_MAX_MB, RESULT_TTL_SECONDS, RESULT_SPILL_DIR
+from config import PRELOAD_MODELS, RESULT_ARTIFACTS, ARTIFACT_STORE_MAX_MB
+import model_registry
+from model_registry import MODEL_WEIGHTS, dr_engine, dr_batcher
+
+# ================= APP =================
+app = FastAPI(title="Diabetic Retinopathy Detection API")
+
+# Enable CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.add_exception_handler(PoolOverloaded, overload_handler)
+
+# ================= STORAGE =================
+results_db = ResultStore("dr", RESULT_STORE_MAX_MB * 1024 * 1024, RESULT_TTL_SECONDS, RESULT_SPILL_DIR)
+artifacts = ArtifactStore("dr_artifacts", ARTIFACT_STORE_MAX_MB * 1024 * 1024, RESULT_TTL_SECONDS, RESULT_SPILL_DIR) if RESULT_ARTIFACTS else None
+job_runner = JobRunner(results_db, artifacts=artifacts)
+inference_cache = InferenceCache("dr_cache", {"dr": MODEL_WEIGHTS["dr"]})
+
+# ================= HELPERS =================
+async def process_upload(analysis_type: str, filename: str, img_bytes: bytes, encoding=None) -> dict:
+    img = await inference_pool.run(process_image_file, img_bytes, filename)
+    
+    if img is None:
+        return {
+            "filename": filename,
+            "error": "Could not process image"
+        }
+
+    return await inference_cache.lookup_or_run(inference_pool, analysis_type, filename, img, analyze_image, encoding)
+
+async def analyze_image(analysis_type: str, filename: str, img: np.ndarray, encoding=None) -> dict:
+    if analysis_type == "dr":
+        # Diabetic Retinopathy Logic
+        prediction = await dr_batcher.submit(img)
+        result = await inference_pool.run(dr_engine.call, "analyze", img, prediction=prediction, encoding=encoding)
+        
+        if "error" in result:
+            return {
+                "filename": filename,
+                "error": result["error"]
+            }
+        return {
+            "filename": filename,
+            "detections_image": result.get('lesion_base64') or result.get('original_base64'),
+            "confidence": result.get('confidence'),
+            "method_used": f"DR AI: {result.get('prediction')}",
+            "smart_mode": True,
+            "dr_details": result 
+        }
+
+    return {
+        "filename": filename,
+        "error": f"Unsupported analysis type: {analysis_type}"
+    }
+
+@app.post("/analyze")
+async def analyze(
+    request: Request,
+    analysis_type: str = Form(...),
+    files: List[UploadFile] = File(...),
+    encoding: Optional[str] = Form(None)
+):
+    # Optional image encoding for this request, e.g. "jpeg:85" or "variants=jpeg:80@768"
+    try:
+        policy = request_encoding(encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Reject before copying anything if the job queue is full (503)
+    job_runner.check_capacity()
+    uploads = [(file.filename, await spool_upload(file)) for file in files]
+    # Mount prefix (e.g. "/tumor" inside main): artifact URLs must point back here
+    root_path = request.scope.get("root_path", "")
+    job_id = job_runner.submit(analysis_type, uploads, functools.partial(process_upload, encoding=policy), root_path)
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "message": "Analysis queued. Poll GET /result/{job_id} until status is 'completed'."
+    }
+
+@app.get("/result/{job_id}")
+async def get_result(job_id: str):
+    record = results_db.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job ID not found")
+    
+    return record
+
+@app.get("/result/{job_id}/artifact/{name}")
+async def get_artifact(job_id: str, name: str, request: Request):
+    if artifacts is None:
+        raise HTTPException(status_code=404, detail="Artifacts are disabled")
+    return artifacts.response(job_id, name, request.headers.get("if-none-match"))
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "engines": {"dr": dr_engine.status()},
+        "results": results_db.snapshot(),
+        "artifacts": artifacts.snapshot() if artifacts is not None else None,
+        "inference_cache": inference_cache.snapshot(),
+        "worker_pool": inference_pool.snapshot(),
+        "batchers": {b.name: b.stats for b in (dr_batcher,)}
+    }
+
+model_registry.preload(PRELOAD_MODELS)
@@ -1,149 +1,221 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
-import cv2
-import numpy as np
-import base64
-import io
-import uuid
-import pydicom
-import os
-from PIL import Image
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from report_generator import ReportGenerator
-
-from tumor_logic import TumorAnalyzer
-
-# ================= APP =================
-app = FastAPI(title="Brain Tumor Detection API")
-
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# ================= REPORT MODELS =================
-class ReportRequest(BaseModel):
-    patient_name: str
-    doctor_name: str
-    diagnosis: str
-    confidence: float
-    metrics: dict
-    images: dict
-    modality: str
-
-# ... existing storage ...
-results_db: Dict[str, dict] = {}
-
-# ================= MODEL =================
-print("⏳ Loading Tumor Engine...")
-tumor_engine = TumorAnalyzer(os.path.abspath("brain_tumor_classifier.pt"))
-
-# ================= HELPERS =================
-def img_to_base64(img):
-    _, buffer = cv2.imencode(".png", cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
-    return base64.b64encode(buffer).decode("utf-8")
-
-def process_image_file(file_content: bytes, filename: str) -> np.ndarray:
-    try:
-        if filename.lower().endswith(".dcm"):
-            dicom_data = pydicom.dcmread(io.BytesIO(file_content))
-            img = dicom_data.pixel_array
-            if img.max() > 255:
-                img = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
-            img = img.astype(np.uint8)
-            if len(img.shape) == 2:
-                img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
-            return img
-        else:
-            return np.array(Image.open(io.BytesIO(file_content)).convert("RGB"))
-    except Exception as e:
-        print(f"Error processing file {filename}: {e}")
-        return None
-
-@app.post("/analyze")
-async def analyze(
-    analysis_type: str = Form(...),
-    files: List[UploadFile] = File(...)
-):
-    job_id = str(uuid.uuid4())
-    responses = []
-
-    for file in files:
-        img_bytes = await file.read()
-        img = process_image_file(img_bytes, file.filename)
-        
-        if img is None:
-            responses.append({
-                "filename": file.filename,
-                "error": "Could not process image"
-            })
-            continue
-
-        if analysis_type == "tumor":
-            # Advanced Tumor Logic
-            result = tumor_engine.analyze(img)
-            
-            responses.append({
-                "filename": file.filename,
-                "detections_image": result['segmented_base64'], 
-                "confidence": result['confidence'],
-                "method_used": f"Tumor AI: {result['prediction']}",
-                "smart_mode": True,
-                "tumor_details": result 
-            })
-
-    results_db[job_id] = {
-        "status": "completed",
-        "analysis_type": analysis_type,
-        "results": responses
-    }
-
-    return {
-        "job_id": job_id,
-        "message": "Analysis complete. Use GET /result/{job_id} to fetch results."
-    }
-
-@app.get("/result/{job_id}")
-async def get_result(job_id: str):
-    if job_id not in results_db:
-        raise HTTPException(status_code=404, detail="Job ID not found")
-    
-    return results_db[job_id]
-
-@app.post("/generate_report")
-async def generate_report(req: ReportRequest):
-    processed_images = {}
-    for key, b64 in req.images.items():
-        try:
-            if "," in b64: b64 = b64.split(",")[1]
-            # Fix padding if needed
-            b64 += "=" * ((4 - len(b64) % 4) % 4)
-            img_data = base64.b64decode(b64)
-            processed_images[key] = Image.open(io.BytesIO(img_data))
-        except Exception as e:
-            print(f"Image decode error {key}: {e}")
-            processed_images[key] = None
-
-    # Sanitized filename
-    safe_name = "".join([c for c in req.patient_name if c.isalnum() or c in "._- "]).strip()
-    pdf_filename = f"Report_{safe_name}.pdf"
-    
-    gen = ReportGenerator(pdf_filename)
-    
-    patient_data = {"name": req.patient_name, "doctor": req.doctor_name}
-    analysis_data = {
-        "diagnosis": req.diagnosis,
-        "confidence": req.confidence,
-        "metrics": req.metrics,
-        "images": processed_images
-    }
-    
-    pdf_path = gen.generate_report(patient_data, analysis_data, modality=req.modality)
-    return FileResponse(pdf_path, media_type='application/pdf', filename=pdf_filename)
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+from typing import List, Dict, Optional
+import cv2
+import numpy as np
+import base64
+import io
+import uuid
+import functools
+import os
+from PIL import Image
+from fastapi.responses import Response
+from pydantic import BaseModel
+from datetime import datetime
+
+from dicom_io import spool_upload
+from image_io import process_image_file, iter_series, request_encoding
+from workers import inference_pool, PoolOverloaded, overload_handler
+import report_service
+from report_service import decode_report_images, report_filename
+from jobs import JobRunner
+from result_store import ResultStore
+from artifact_store import ArtifactStore
+from inference_cache import InferenceCache
+from config import RESULT_STORE_MAX_MB, RESULT_TTL_SECONDS, RESULT_SPILL_DIR
+from config import PRELOAD_MODELS, RESULT_ARTIFACTS, ARTIFACT_STORE_MAX_MB, REPORT_BULK_MAX_CASES
+import model_registry
+from model_registry import MODEL_WEIGHTS, tumor_engine, tumor_batcher
+
+# ================= APP =================
+app = FastAPI(title="Brain Tumor Detection API")
+
+# Enable CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.add_exception_handler(PoolOverloaded, overload_handler)
+
+# ================= REPORT MODELS =================
+class ReportRequest(BaseModel):
+    patient_name: str
+    doctor_name: str
+    diagnosis: str
+    confidence: float
+    metrics: dict
+    images: dict
+    modality: str
+
+class BulkReportRequest(BaseModel):
+    reports: List[ReportRequest]
+    merge: bool = False
+
+# ... existing storage ...
+results_db = ResultStore("tumor", RESULT_STORE_MAX_MB * 1024 * 1024, RESULT_TTL_SECONDS, RESULT_SPILL_DIR)
+artifacts = ArtifactStore("tumor_artifacts", ARTIFACT_STORE_MAX_MB * 1024 * 1024, RESULT_TTL_SECONDS, RESULT_SPILL_DIR) if RESULT_ARTIFACTS else None
+job_runner = JobRunner(results_db, artifacts=artifacts)
+inference_cache = InferenceCache("tumor_cache", {"tumor": MODEL_WEIGHTS["tumor"]})
+
+# ================= HELPERS =================
+async def process_upload(analysis_type: str, filename: str, img_bytes: bytes, encoding=None) -> dict:
+    img = await inference_pool.run(process_image_file, img_bytes, filename)
+    
+    if img is None:
+        return {
+            "filename": filename,
+            "error": "Could not process image"
+        }
+
+    return await inference_cache.lookup_or_run(inference_pool, analysis_type, filename, img, analyze_image, encoding)
+
+def tumor_response(filename: str, result: dict) -> dict:
+    return {
+        "filename": filename,
+        "detections_image": result['segmented_base64'], 
+        "confidence": result['confidence'],
+        "method_used": f"Tumor AI: {result['prediction']}",
+        "smart_mode": True,
+        "tumor_details": result 
+    }
+
+async def analyze_image(analysis_type: str, filename: str, img: np.ndarray, encoding=None) -> dict:
+    if analysis_type == "tumor":
+        # Advanced Tumor Logic
+        prediction = await tumor_batcher.submit(img)
+        result = await inference_pool.run(tumor_engine.call, "analyze", img, prediction=prediction, encoding=encoding)
+        return tumor_response(filename, result)
+
+    return {
+        "filename": filename,
+        "error": f"Unsupported analysis type: {analysis_type}"
+    }
+
+def load_study(uploads: list) -> list:
+    """
+    (filename, image) for every slice of the study, in series order.
+    Frames are decoded one at a time and only a copy at the classifier's
+    224x224 input size is kept, so large series never sit in memory at full size.
+    """
+    return [(label, cv2.resize(img, (224, 224)) if img is not None else None) for label, img in iter_series(uploads)]
+
+async def process_study(analysis_type: str, uploads: list, encoding=None) -> dict:
+    """All slices of one MRI study: one batched classification, CAM only on tumor slices."""
+    decoded = await inference_pool.run(load_study, uploads)
+    slices = [(filename, img) for filename, img in decoded if img is not None]
+    errors = [{"filename": filename, "error": "Could not process image"} for filename, img in decoded if img is None]
+
+    study = await inference_pool.run(
+        tumor_engine.call,
+        "analyze_batch",
+        [img for _, img in slices],
+        [filename for filename, _ in slices],
+        encoding
+    )
+    results = [tumor_response(s["filename"], s) for s in study["slices"]]
+    return {"results": results + errors, "summary": study["summary"]}
+
+@app.post("/analyze")
+async def analyze(
+    request: Request,
+    analysis_type: str = Form(...),
+    files: List[UploadFile] = File(...),
+    encoding: Optional[str] = Form(None)
+):
+    # Optional image encoding for this request, e.g. "jpeg:85" or "variants=jpeg:80@768"
+    try:
+        policy = request_encoding(encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Reject before copying anything if the job queue is full (503)
+    job_runner.check_capacity()
+    uploads = [(file.filename, await spool_upload(file)) for file in files]
+    # Mount prefix (e.g. "/tumor" inside main): artifact URLs must point back here
+    root_path = request.scope.get("root_path", "")
+    if analysis_type == "tumor_study":
+        # Every file is a slice of the same study (summary in the job record)
+        job_id = job_runner.submit_study(analysis_type, uploads, functools.partial(process_study, encoding=policy), root_path)
+    else:
+        job_id = job_runner.submit(analysis_type, uploads, functools.partial(process_upload, encoding=policy), root_path)
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "message": "Analysis queued. Poll GET /result/{job_id} until status is 'completed'."
+    }
+
+@app.get("/result/{job_id}")
+async def get_result(job_id: str):
+    record = results_db.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job ID not found")
+    
+    return record
+
+@app.get("/result/{job_id}/artifact/{name}")
+async def get_artifact(job_id: str, name: str, request: Request):
+    if artifacts is None:
+        raise HTTPException(status_code=404, detail="Artifacts are disabled")
+    return artifacts.response(job_id, name, request.headers.get("if-none-match"))
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "engines": {"tumor": tumor_engine.status()},
+        "results": results_db.snapshot(),
+        "artifacts": artifacts.snapshot() if artifacts is not None else None,
+        "inference_cache": inference_cache.snapshot(),
+        "worker_pool": inference_pool.snapshot(),
+        "batchers": {b.name: b.stats for b in (tumor_batcher,)},
+        "report_pool": report_service.report_pool.snapshot()
+    }
+
+def report_case(req: ReportRequest) -> dict:
+    """Render input of one report request (images decoded to their encoded bytes)."""
+    return {
+        "patient_data": {"name": req.patient_name, "doctor": req.doctor_name},
+        "analysis_data": {
+            "diagnosis": req.diagnosis,
+            "confidence": req.confidence,
+            "metrics": req.metrics,
+            "images": decode_report_images(req.images)
+        },
+        "modality": req.modality
+    }
+
+@app.post("/generate_report")
+async def generate_report(req: ReportRequest):
+    case = await inference_pool.run(report_case, req)
+    pdf_bytes = await report_service.render(case)
+    return Response(
+        content=pdf_bytes,
+        media_type='application/pdf',
+        headers={"Content-Disposition": f'attachment; filename="{report_filename(req.patient_name)}"'}
+    )
+
+@app.post("/generate_reports")
+async def generate_reports(req: BulkReportRequest):
+    """Batch export: one merged PDF (merge=true) or a ZIP with one PDF per case."""
+    if not req.reports:
+        raise HTTPException(status_code=400, detail="No reports requested")
+    if len(req.reports) > REPORT_BULK_MAX_CASES:
+        raise HTTPException(status_code=400, detail=f"At most {REPORT_BULK_MAX_CASES} reports per export")
+
+    cases = await inference_pool.run(lambda: [report_case(r) for r in req.reports])
+    filenames = [report_filename(r.patient_name) for r in req.reports]
+    content, media_type = await report_service.render_bulk(cases, filenames, merge=req.merge)
+
+    export_name = f"Reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}." + ("pdf" if req.merge else "zip")
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export_name}"'}
+    )
+
+model_registry.preload(PRELOAD_MODELS)
@@ -0,0 +1,116 @@
+import base64
+import hashlib
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from result_store import ResultStore
+
+# ==========================================
+# 🖼️ JOB ARTIFACTS (RESULT IMAGES AS RAW BYTES)
+# ==========================================
+# Engines still return base64 PNGs (they are cached that way); when a job
+# records a file's response, every image in it is moved here and replaced
+# by a small reference. Clients fetch the bytes from
+# GET /result/{job_id}/artifact/{name} of the app that ran the job (the URL
+# includes its mount prefix, if any), which sends an ETag and may be
+# cached by the browser: artifacts never change once written.
+MEDIA_TYPES = (
+    (b"\x89PNG", "image/png"),
+    (b"\xff\xd8", "image/jpeg"),
+    (b"RIFF", "image/webp")
+)
+
+def sniff_media_type(data):
+    for magic, media_type in MEDIA_TYPES:
+        if data.startswith(magic):
+            return media_type
+    return "application/octet-stream"
+
+def is_image_field(key):
+    """Response keys holding a base64 image."""
+    return key == "detections_image" or key.endswith("_base64")
+
+class ArtifactStore(ResultStore):
+    """
+    Result images keyed by "{job_id}.{name}", with the memory budget, TTL
+    and disk spill of ResultStore (spilled artifacts are raw image files).
+    """
+    SPILL_EXT = ".bin"
+
+    def put(self, job_id, name, data, root_path=""):
+        """
+        Stores `data` (encoded image bytes) and returns its reference for the
+        job results. `root_path` is the mount prefix of the app serving it
+        (e.g. "/tumor" when api_tumor is mounted on main).
+        """
+        record = self._record(data)
+        self[f"{job_id}.{name}"] = record
+        return {
+            "artifact": name,
+            "url": f"{root_path}/result/{job_id}/artifact/{name}",
+            "media_type": record["media_type"],
+            "bytes": len(data)
+        }
+
+    def get_artifact(self, job_id, name):
+        return self.get(f"{job_id}.{name}")
+
+    def externalize(self, job_id, index, response, root_path=""):
+        """
+        Copy of one file's response with every base64 image (detections_image,
+        *_base64 and the advanced-mode `outputs`) replaced by an artifact
+        reference. Identical images in one response are stored once.
+        The input is not modified (it may be shared with the inference cache).
+        """
+        stored = {} # base64 string -> reference
+
+        def reference(value, name):
+            if value not in stored:
+                stored[value] = self.put(job_id, f"{index}-{name}", base64.b64decode(value), root_path)
+            return stored[value]
+
+        def walk(obj, path):
+            out = {}
+            for key, value in obj.items():
+                name = f"{path}.{key}" if path else key
+                if isinstance(value, str) and value and is_image_field(key):
+                    out[key] = reference(value, name)
+                elif key == "outputs" and isinstance(value, dict):
+                    out[key] = {k: reference(v, f"{name}.{k}") if isinstance(v, str) and v else v for k, v in value.items()}
+                elif isinstance(value, dict):
+                    out[key] = walk(value, name)
+                else:
+                    out[key] = value
+            return out
+
+        return walk(response, "")
+
+    def response(self, job_id, name, if_none_match=None):
+        """HTTP response for one artifact (304 when the client's ETag still matches)."""
+        record = self.get_artifact(job_id, name)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+
+        max_age = int(self.ttl) if self.ttl else 365 * 24 * 3600
+        headers = {
+            "ETag": record["etag"],
+            "Cache-Control": f"private, max-age={max_age}, immutable"
+        }
+        if if_none_match and record["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=record["data"], media_type=record["media_type"], headers=headers)
+
+    # ---------- spill format ----------
+    def _record(self, data):
+        return {
+            "data": data,
+            "etag": '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"',
+            "media_type": sniff_media_type(data)
+        }
+
+    def _serialize(self, record):
+        return record["data"]
+
+    def _deserialize(self, data):
+        return self._record(data)
@@ -0,0 +1,100 @@
+import asyncio
+
+# ==========================================
+# 📦 CROSS-REQUEST MICRO-BATCHING
+# ==========================================
+class MicroBatcher:
+    """
+    Groups single-image requests for one engine into batched forward passes.
+
+    Callers `await batcher.submit(img)` and get back the output for their own
+    image. A background task collects everything that arrives within
+    `window_ms` of the first queued item (up to `max_batch_size` items),
+    calls `batch_fn(list_of_items)` once and hands each output back to its
+    caller. `batch_fn` must return one output per input, in order.
+
+    `runner` (e.g. InferencePool.run) executes `batch_fn` off the event loop;
+    only one batch per engine is in flight at a time.
+    """
+    def __init__(self, name, batch_fn, max_batch_size=8, window_ms=5.0, runner=None):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.runner = runner
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, window_ms) / 1000.0
+
+        self._queue = None
+        self._loop = None
+        self._worker = None
+
+        self.stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        self.stats["requests"] += 1
+        await self._queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self, loop):
+        # The worker is bound to the loop it was created on (TestClient and
+        # uvicorn --reload may hand us a fresh loop).
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already waiting before sleeping on the window
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Skip callers that went away (client disconnect / cancellation)
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if batch:
+                await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+        items = [item for item, _ in batch]
+        try:
+            if self.runner is not None:
+                outputs = await self.runner(self.batch_fn, items)
+            else:
+                outputs = self.batch_fn(items)
+            outputs = list(outputs)
+            # A short output list would leave the last callers waiting forever
+            if len(outputs) != len(batch):
+                raise RuntimeError(f"{self.name} batch returned {len(outputs)} outputs for {len(batch)} inputs")
+        except Exception as e:
+            print(f"⚠️ Batch error in {self.name} engine: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
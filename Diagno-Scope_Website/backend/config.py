@@ -0,0 +1,158 @@
+import os
+
+# ==========================================
+# ⚙️ RUNTIME SETTINGS (override via environment)
+# ==========================================
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        print(f"Warning: invalid value for {name}, using {default}")
+        return default
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        print(f"Warning: invalid value for {name}, using {default}")
+        return default
+
+# ================= BATCHING =================
+# Requests reaching the same engine within BATCH_WINDOW_MS are grouped
+# into one forward pass of at most BATCH_MAX_SIZE images.
+BATCH_MAX_SIZE = _env_int("DIAGNO_BATCH_MAX_SIZE", 8)
+BATCH_WINDOW_MS = _env_float("DIAGNO_BATCH_WINDOW_MS", 5.0)
+
+# ================= WORKER POOL =================
+# CPU-bound steps (decode, inference, filters, PNG encoding) run on this
+# many threads; beyond WORKER_MAX_PENDING queued steps new work gets a 503.
+WORKER_THREADS = _env_int("DIAGNO_WORKER_THREADS", os.cpu_count() or 4)
+WORKER_MAX_PENDING = _env_int("DIAGNO_WORKER_MAX_PENDING", 64)
+
+# ================= REPORT RENDERING =================
+# PDF reports are built on REPORT_WORKERS processes; beyond REPORT_MAX_PENDING
+# queued builds new report requests get a 503. A bulk export takes at most
+# REPORT_BULK_MAX_CASES cases.
+REPORT_WORKERS = _env_int("DIAGNO_REPORT_WORKERS", 2)
+REPORT_MAX_PENDING = _env_int("DIAGNO_REPORT_MAX_PENDING", 32)
+REPORT_BULK_MAX_CASES = _env_int("DIAGNO_REPORT_BULK_MAX_CASES", 200)
+
+# ================= JOBS =================
+# /analyze only enqueues; at most JOB_MAX_ACTIVE jobs run at once and
+# more than JOB_MAX_QUEUED unfinished jobs are refused with a 503.
+JOB_MAX_ACTIVE = _env_int("DIAGNO_JOB_MAX_ACTIVE", 4)
+JOB_MAX_QUEUED = _env_int("DIAGNO_JOB_MAX_QUEUED", 100)
+# A running job waits for a saturated worker pool at most
+# JOB_OVERLOAD_TIMEOUT_SECONDS per file (per study); then that file is
+# reported as failed (the study job fails).
+JOB_OVERLOAD_TIMEOUT_SECONDS = _env_float("DIAGNO_JOB_OVERLOAD_TIMEOUT_SECONDS", 300.0)
+
+# ================= RESULT STORE =================
+# Finished jobs are kept within RESULT_STORE_MAX_MB (LRU) for at most
+# RESULT_TTL_SECONDS. Set RESULT_SPILL_DIR to keep evicted jobs on disk.
+RESULT_STORE_MAX_MB = _env_int("DIAGNO_RESULT_STORE_MAX_MB", 512)
+RESULT_TTL_SECONDS = _env_int("DIAGNO_RESULT_TTL_SECONDS", 3600)
+RESULT_SPILL_DIR = os.environ.get("DIAGNO_RESULT_SPILL_DIR") or None
+
+# ================= INFERENCE CACHE =================
+# Re-submitted scans (same pixels, analysis type, model weights, image
+# encoding and output settings, see inference_cache.OUTPUT_SETTINGS) are
+# answered from this cache instead of running inference again.
+CACHE_ENABLED = os.environ.get("DIAGNO_CACHE_ENABLED", "1") != "0"
+CACHE_MAX_MB = _env_int("DIAGNO_CACHE_MAX_MB", 256)
+CACHE_TTL_SECONDS = _env_int("DIAGNO_CACHE_TTL_SECONDS", 24 * 3600)
+CACHE_DIR = os.environ.get("DIAGNO_CACHE_DIR") or None
+
+# ================= MODEL LOADING =================
+# Engines load on first use. List engines here ("fracture,tumor,dr" or
+# "all") to load them at startup instead.
+PRELOAD_MODELS = os.environ.get("DIAGNO_PRELOAD_MODELS", "")
+
+# ================= DR INFERENCE BACKEND =================
+# "eager" (default), "torchscript" (frozen + fused graph), "onnx"
+# (ONNX Runtime, CPU) or "int8" (static quantization). Exported graphs are
+# cached in DR_EXPORT_DIR (default: next to the weights) and must match
+# eager within DR_PARITY_ATOL.
+DR_BACKEND = os.environ.get("DIAGNO_DR_BACKEND", "eager").lower()
+DR_EXPORT_DIR = os.environ.get("DIAGNO_DR_EXPORT_DIR") or None
+DR_PARITY_ATOL = _env_float("DIAGNO_DR_PARITY_ATOL", 1e-3)
+# DR_CALIBRATION_DIR holds sample fundus images (at most DR_CALIBRATION_LIMIT
+# are loaded): torchscript/onnx must also match eager on them (without it only
+# random inputs are checked; run dr_parity.py on real images before deploying),
+# int8 is calibrated on them and only used if it agrees with fp32 on at least
+# DR_INT8_MIN_AGREEMENT of them.
+DR_CALIBRATION_DIR = os.environ.get("DIAGNO_DR_CALIBRATION_DIR") or None
+DR_CALIBRATION_LIMIT = _env_int("DIAGNO_DR_CALIBRATION_LIMIT", 64)
+DR_INT8_MIN_AGREEMENT = _env_float("DIAGNO_DR_INT8_MIN_AGREEMENT", 0.9)
+
+# ================= VESSEL EXTRACTION =================
+# Frangi vesselness runs on a copy whose long side is at most VESSEL_MAX_SIDE
+# pixels (0 = full resolution); the mask is upsampled back afterwards.
+# Lossy: vessels only a pixel or two wide at full resolution are lost
+# (vesselness_bench.py: mask Dice ~0.75 vs full resolution at 1024).
+VESSEL_MAX_SIDE = _env_int("DIAGNO_VESSEL_MAX_SIDE", 0)
+
+# ================= DR WORKING RESOLUTION =================
+# Lesion/vessel processing runs on a copy whose long side is at most
+# DR_ANALYSIS_MAX_SIDE; the returned images are rendered with a long side of
+# at most DR_DISPLAY_MAX_SIDE (0 = keep the upload's resolution, the default).
+# Both are lossy: the lesion masks and affected_percent of larger fundus
+# images change. 1024 is the recommended value where speed matters more
+# (check the vessel masks on local data first with vesselness_bench.py).
+DR_ANALYSIS_MAX_SIDE = _env_int("DIAGNO_DR_ANALYSIS_MAX_SIDE", 0)
+DR_DISPLAY_MAX_SIDE = _env_int("DIAGNO_DR_DISPLAY_MAX_SIDE", 0)
+
+# ================= ADVANCED FILTERS =================
+# Large Retinex surrounds are blurred on a downsampled pyramid level where
+# the sigma still spans FILTER_PYRAMID_MIN_SIGMA pixels (0 = full-resolution
+# GaussianBlur for every sigma, slow on large radiographs).
+FILTER_PYRAMID_MIN_SIGMA = _env_float("DIAGNO_FILTER_PYRAMID_MIN_SIGMA", 4.0)
+
+# ================= SMART MODE SEARCH =================
+# Smart mode runs its variants best-win-rate first: SMART_FIRST_STAGE of them
+# in one batch, the rest only if none reached SMART_EARLY_EXIT_CONF
+# (0 = always evaluate every variant).
+SMART_EARLY_EXIT_CONF = _env_float("DIAGNO_SMART_EARLY_EXIT_CONF", 0.6)
+SMART_FIRST_STAGE = _env_int("DIAGNO_SMART_FIRST_STAGE", 1)
+# Once a bucket of similar radiographs (mean intensity / contrast / edge
+# density) has SMART_POLICY_MIN_SAMPLES recorded searches (0 = never), its
+# SMART_POLICY_TOP_K most frequent winners run first and the others only if
+# none of them detected anything; SMART_POLICY_EXPLORE of those searches
+# still evaluate every variant. Only explore runs and plain searches that
+# evaluated more than one variant update the win counts. Searches are
+# appended to SMART_TELEMETRY_PATH (JSON lines, unset = memory only), the
+# last SMART_TELEMETRY_MAX_RECORDS are replayed at startup and the file is
+# cut back to them once it holds twice as many.
+SMART_POLICY_TOP_K = _env_int("DIAGNO_SMART_POLICY_TOP_K", 2)
+SMART_POLICY_MIN_SAMPLES = _env_int("DIAGNO_SMART_POLICY_MIN_SAMPLES", 50)
+SMART_POLICY_EXPLORE = _env_float("DIAGNO_SMART_POLICY_EXPLORE", 0.1)
+SMART_TELEMETRY_PATH = os.environ.get("DIAGNO_SMART_TELEMETRY_PATH") or None
+SMART_TELEMETRY_MAX_RECORDS = _env_int("DIAGNO_SMART_TELEMETRY_MAX_RECORDS", 50000)
+
+# ================= UPLOAD SPOOLING =================
+# Uploads are streamed into a spooled buffer that moves to a temp file (in
+# UPLOAD_SPOOL_DIR, default: system temp) once it exceeds UPLOAD_SPOOL_MAX_MB.
+UPLOAD_SPOOL_MAX_MB = _env_int("DIAGNO_UPLOAD_SPOOL_MAX_MB", 8)
+UPLOAD_SPOOL_DIR = os.environ.get("DIAGNO_UPLOAD_SPOOL_DIR") or None
+
+# ================= IMAGE DECODING =================
+# JPEG uploads whose long side is at least twice IMAGE_DECODE_MAX_SIDE are
+# decoded at 1/2, 1/4 or 1/8 scale (never below this size; 0 = always full
+# size, the default). Lossy: the models see (and the responses return) the
+# smaller image, so enable it per deployment (e.g. 2048).
+IMAGE_DECODE_MAX_SIDE = _env_int("DIAGNO_IMAGE_DECODE_MAX_SIDE", 0)
+
+# ================= RESULT ARTIFACTS =================
+# Result images are served as raw bytes by GET /result/{job_id}/artifact/{name}
+# (ETag + Cache-Control); job results only carry references to them. They
+# share the result TTL / spill dir and use at most ARTIFACT_STORE_MAX_MB of
+# memory. DIAGNO_RESULT_ARTIFACTS=0 keeps base64 images inline in the JSON.
+RESULT_ARTIFACTS = os.environ.get("DIAGNO_RESULT_ARTIFACTS", "1") != "0"
+ARTIFACT_STORE_MAX_MB = _env_int("DIAGNO_ARTIFACT_STORE_MAX_MB", 1024)
+
+# ================= IMAGE ENCODING =================
+# Encoder for result images per artifact kind (detections, variants, overlay,
+# original), e.g. "default=png:1,variants=jpeg:80@768,overlay=webp"; see
+# image_io.EncodingPolicy. Requests can override it with an `encoding` field.
+# Empty = PNG at OpenCV's default compression for everything.
+IMAGE_ENCODING = os.environ.get("DIAGNO_IMAGE_ENCODING", "")
@@ -0,0 +1,117 @@
+import io
+import shutil
+import asyncio
+import tempfile
+
+import cv2
+import numpy as np
+import pydicom
+from pydicom.pixels import iter_pixels, pixel_array
+
+from config import UPLOAD_SPOOL_MAX_MB, UPLOAD_SPOOL_DIR
+from dicom_window import WindowLUT, header_window, normalize_to_uint8, first_value
+
+# ==========================================
+# 📥 STREAMED UPLOADS + LAZY DICOM DECODING
+# ==========================================
+# Uploads are copied chunk by chunk into a spooled buffer (memory, then a
+# temp file) instead of one `await file.read()`. DICOM headers are parsed
+# without touching Pixel Data; frames are decoded one at a time, only when
+# they are needed, so a 500-frame CT never sits in memory as one array.
+CHUNK_SIZE = 1 << 20
+
+async def spool_upload(upload, chunk_size=CHUNK_SIZE):
+    """
+    Copies a FastAPI UploadFile into a SpooledTemporaryFile (rewound).
+    Unlike the UploadFile it outlives the request, so background jobs can
+    read it; close it once the job is done.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MB * 1024 * 1024, dir=UPLOAD_SPOOL_DIR)
+    await upload.seek(0)
+    # Off the event loop: past the spool limit this is disk I/O
+    await asyncio.to_thread(shutil.copyfileobj, upload.file, spool, chunk_size)
+    spool.seek(0)
+    return spool
+
+def as_file(content):
+    """Rewound binary file for raw bytes or a spooled upload."""
+    if isinstance(content, (bytes, bytearray)):
+        return io.BytesIO(content)
+    content.seek(0)
+    return content
+
+def is_dicom(filename, fp):
+    """DICOM by extension, or by the 'DICM' magic after the 128-byte preamble."""
+    if filename.lower().endswith((".dcm", ".dicom")):
+        return True
+    fp.seek(128)
+    magic = fp.read(4)
+    fp.seek(0)
+    return magic == b"DICM"
+
+class DicomFile:
+    """
+    One DICOM upload: the header is parsed up front, the pixel data stays in
+    `fp` and is only decoded by frames() / frame(index).
+    """
+    def __init__(self, fp, filename=""):
+        self.fp = fp
+        self.filename = filename
+        fp.seek(0)
+        self.header = header = pydicom.dcmread(fp, stop_before_pixels=True, force=True)
+
+        self.modality = str(header.get("Modality", ""))
+        self.rows = int(header.get("Rows", 0))
+        self.cols = int(header.get("Columns", 0))
+        self.frame_count = int(header.get("NumberOfFrames", 1) or 1)
+        self.photometric = str(header.get("PhotometricInterpretation", ""))
+        self.series_uid = str(header.get("SeriesInstanceUID", ""))
+        self.instance_number = int(first_value(header.get("InstanceNumber"), 0))
+        self.bits_allocated = int(header.get("BitsAllocated", 8))
+        self.pixel_representation = int(header.get("PixelRepresentation", 0))
+
+        self.window = header_window(header)
+        self.rescale = (float(first_value(header.get("RescaleSlope"), 1.0)), float(first_value(header.get("RescaleIntercept"), 0.0)))
+
+    def frames(self):
+        """Decoded frames in order, one numpy array at a time."""
+        self.fp.seek(0)
+        yield from iter_pixels(self.fp)
+
+    def frame(self, index=0):
+        """Decodes only frame `index`."""
+        self.fp.seek(0)
+        return pixel_array(self.fp, index=index if self.frame_count > 1 else None)
+
+    def lut_key(self):
+        """Files of one series sharing this key can share one WindowLUT."""
+        return (self.series_uid, self.bits_allocated, self.pixel_representation,
+                self.window, self.rescale, self.photometric)
+
+    def window_lut(self, sample_frame=None):
+        """Display LUT from this file's header (see dicom_window.WindowLUT)."""
+        return WindowLUT.from_header(self.header, sample_frame)
+
+    def display_frame(self, index=0):
+        """Frame `index` as 8-bit RGB, windowed like a DICOM viewer would."""
+        frame = self.frame(index)
+        return frame_to_rgb(frame, self.window_lut(frame))
+
+    def describe(self):
+        return {
+            "modality": self.modality,
+            "rows": self.rows,
+            "cols": self.cols,
+            "frames": self.frame_count,
+            "window": self.window,
+            "rescale": self.rescale
+        }
+
+def frame_to_rgb(frame, lut=None):
+    """8-bit RGB view of one decoded frame (as the APIs expect)."""
+    frame = lut.apply(frame) if lut is not None else normalize_to_uint8(frame)
+
+    # Convert to RGB (DICOM is usually single channel grayscale)
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+    return frame
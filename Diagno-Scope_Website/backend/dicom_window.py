@@ -0,0 +1,112 @@
+import cv2
+import numpy as np
+from pydicom.pixels import apply_modality_lut
+
+# ==========================================
+# 🪟 DICOM WINDOW / LEVEL -> 8-BIT LOOKUP TABLES
+# ==========================================
+# stored value -> modality value (RescaleSlope/Intercept or Modality LUT)
+#              -> VOI window (WindowCenter/WindowWidth) -> 0-255
+# is evaluated once per series for every possible stored value (<= 16 bits
+# allocated). Each frame is then converted with a single gather (cv2.LUT for
+# 8-bit data, np.take otherwise) instead of a float normalize pass.
+def first_value(value, default=None):
+    """First item of a (possibly multi-valued) DICOM attribute."""
+    if value is None or value == "":
+        return default
+    try:
+        return value[0] if len(value) else default
+    except TypeError:
+        return value
+
+def header_window(header):
+    """(center, width) from WindowCenter/WindowWidth, or None."""
+    center = first_value(header.get("WindowCenter"))
+    width = first_value(header.get("WindowWidth"))
+    if center is None or width is None:
+        return None
+    return float(center), float(width)
+
+def window_to_uint8(values, center, width, function="LINEAR"):
+    """DICOM VOI windowing (PS3.3 C.11.2.1.2/3) of modality values onto 0-255."""
+    values = np.asarray(values, dtype=np.float64)
+    if function == "SIGMOID":
+        out = 255.0 / (1.0 + np.exp(-4.0 * (values - center) / width))
+    elif function == "LINEAR_EXACT":
+        out = ((values - center) / width + 0.5) * 255.0
+    elif width <= 1:
+        out = np.where(values > center - 0.5, 255.0, 0.0)
+    else:
+        out = ((values - (center - 0.5)) / (width - 1.0) + 0.5) * 255.0
+    return (np.clip(out, 0, 255) + 0.5).astype(np.uint8)
+
+class WindowLUT:
+    """
+    8-bit display table for one series, indexed by a frame's raw bit pattern
+    (signed frames are viewed as unsigned, so no offset copy is needed).
+    """
+    def __init__(self, table, window=None):
+        self.table = table
+        self.window = window
+
+    @classmethod
+    def from_header(cls, header, sample_frame=None):
+        """
+        Builds the table from the DICOM header. Without a window in the header
+        the modality value range of `sample_frame` (e.g. the series' first
+        frame) is stretched instead; 8-bit data without rescale maps 1:1.
+        Returns None for data the table cannot index (> 16 bits, float).
+        """
+        bits_allocated = int(header.get("BitsAllocated", 8))
+        if bits_allocated > 16:
+            return None
+        size = 256 if bits_allocated <= 8 else 65536
+
+        stored = np.arange(size, dtype=np.int64)
+        if int(header.get("PixelRepresentation", 0)) == 1:
+            stored[size // 2:] -= size # two's complement bit patterns
+        values = apply_modality_lut(stored, header).astype(np.float64)
+
+        window = header_window(header)
+        if window is None and size == 256 and np.array_equal(values, stored):
+            table = stored.astype(np.uint8)
+        elif window is None:
+            # No VOI attributes: stretch the sample frame's range over the whole series
+            if sample_frame is None:
+                return None
+            sample = np.take(values, cls._patterns(sample_frame))
+            lo, hi = float(sample.min()), float(sample.max())
+            window = ((lo + hi) / 2.0, max(hi - lo, 1.0))
+            table = window_to_uint8(values, window[0], window[1], "LINEAR_EXACT")
+        else:
+            function = str(header.get("VOILUTFunction", "LINEAR")).upper()
+            table = window_to_uint8(values, window[0], window[1], function)
+
+        if str(header.get("PhotometricInterpretation", "")) == "MONOCHROME1":
+            table = 255 - table # low values are displayed white
+        return cls(np.ascontiguousarray(table), window)
+
+    @staticmethod
+    def _patterns(frame):
+        """Unsigned view of a frame's stored values (no copy for native-endian data)."""
+        if not frame.dtype.isnative:
+            frame = frame.astype(frame.dtype.newbyteorder("="))
+        frame = np.ascontiguousarray(frame)
+        return frame.view(np.uint8) if frame.dtype.itemsize == 1 else frame.view(np.uint16)
+
+    def apply(self, frame):
+        """uint8 frame of the same shape."""
+        if frame.dtype.itemsize > 2 or frame.dtype.kind == "f":
+            return normalize_to_uint8(frame)
+        patterns = self._patterns(frame)
+        if (self.table.size == 256) != (patterns.dtype == np.uint8):
+            return normalize_to_uint8(frame) # frame does not match the header's BitsAllocated
+        if self.table.size == 256:
+            return cv2.LUT(patterns, self.table)
+        return np.take(self.table, patterns)
+
+def normalize_to_uint8(frame):
+    """Min-max stretch for data no table covers (32-bit or float pixels)."""
+    if frame.dtype == np.uint8:
+        return frame
+    return cv2.normalize(frame.astype(np.float32), None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+
+# ==========================================
+# 👁️ DR IMAGE HELPERS (SHARED BY BOTH DR ENGINES)
+# ==========================================
+# Image-only helpers used by blood.DRAnalyzer and
+# retinopathy.RetinopathyEngine, so neither imports the other.
+def fit_long_side(img, max_side, interpolation=cv2.INTER_AREA):
+    """Downscales `img` so its long side is at most `max_side` (0/None = unchanged)."""
+    height, width = img.shape[:2]
+    if not max_side or max(height, width) <= max_side:
+        return img
+    scale = max_side / float(max(height, width))
+    return cv2.resize(img, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=interpolation)
+
+def percentile_thresholds(img, percentiles):
+    """
+    np.percentile(img, q) (linear interpolation) for every q in `percentiles`
+    from one 256-bin histogram of a uint8 image: no sort and no copy.
+    """
+    cdf = np.cumsum(cv2.calcHist([img], [0], None, [256], [0, 256]).ravel().astype(np.int64))
+    ranks = np.asarray(percentiles, dtype=np.float64) / 100.0 * (cdf[-1] - 1)
+    lower = np.floor(ranks).astype(np.int64)
+    # k-th smallest pixel value (0-based) = first bin whose cumulative count exceeds k
+    v_lower = np.searchsorted(cdf, lower, side="right")
+    v_upper = np.searchsorted(cdf, np.minimum(lower + 1, cdf[-1] - 1), side="right")
+    return v_lower + (v_upper - v_lower) * (ranks - lower)
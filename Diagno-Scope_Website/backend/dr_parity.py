@@ -0,0 +1,130 @@
+"""
+Parity / accuracy / latency report of the DR backends against eager PyTorch.
+
+    python dr_parity.py path/to/fundus_images [--backends torchscript,onnx,int8] [--runs 5]
+
+Runs every image in the folder through the eager DenseNet121 and each
+backend, then prints top-1 agreement, the largest logit/probability
+difference, the per-image latency (p50) and the weight size of each runtime.
+
+If the images sit in one sub-folder per class (named like DRAnalyzer.class_names,
+e.g. "No DR", "Mild DR", ... or 0-4), accuracy per class is reported for
+eager and every backend, with the drift relative to eager.
+
+int8 is calibrated on --calibration (defaults to the image folder).
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import torch
+from PIL import Image
+
+from blood import DRAnalyzer
+from dr_runtime import compare_logits, list_images, serialized_size
+
+def load_images(analyzer, folder):
+    """Returns (paths, batch tensor, labels or None) for every image under `folder`."""
+    paths = list_images(folder)
+    if not paths:
+        sys.exit(f"No images found in {folder}")
+    batch = torch.stack([analyzer.transform(Image.open(p).convert("RGB")) for p in paths])
+
+    # Labels come from the class sub-folder, when every image has one
+    lookup = {name.lower(): i for i, name in enumerate(analyzer.class_names)}
+    lookup.update({str(i): i for i in range(len(analyzer.class_names))})
+    labels = [lookup.get(os.path.basename(os.path.dirname(p)).lower()) for p in paths]
+    return paths, batch, (labels if None not in labels else None)
+
+def p50_latency_ms(runner, batch, runs):
+    timings = []
+    with torch.no_grad():
+        runner(batch[:1]) # warm-up
+        for _ in range(runs):
+            for i in range(len(batch)):
+                started = time.perf_counter()
+                runner(batch[i:i + 1])
+                timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+def weight_size_mb(analyzer):
+    if isinstance(analyzer.runner, torch.nn.Module) and not isinstance(analyzer.runner, torch.jit.ScriptModule):
+        return serialized_size(analyzer.runner) / (1024 * 1024)
+    return None # frozen graphs and ONNX Runtime sessions keep the fp32 weights as constants
+
+def per_class_accuracy(logits, labels, n_classes):
+    preds = logits.argmax(1).tolist()
+    accuracy = {}
+    for c in range(n_classes):
+        hits = [p == c for p, l in zip(preds, labels) if l == c]
+        accuracy[c] = (sum(hits) / len(hits)) if hits else None
+    return accuracy
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="folder with the fixed fundus image set")
+    parser.add_argument("--weights", default="best_modeldensenet121.pth")
+    parser.add_argument("--backends", default="torchscript,onnx,int8")
+    parser.add_argument("--calibration", help="int8 calibration images (default: the image folder)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    eager = DRAnalyzer(args.weights, backend="eager")
+    if eager.model is None:
+        sys.exit("Could not load the DR model")
+
+    paths, batch, labels = load_images(eager, args.images)
+    n_classes = len(eager.class_names)
+    with torch.no_grad():
+        reference = eager.model(batch)
+
+    rows = [("eager", reference, p50_latency_ms(eager.model, batch, args.runs), weight_size_mb(eager))]
+    failed = False
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        analyzer = DRAnalyzer(args.weights, backend=backend, calibration_dir=args.calibration or args.images)
+        if analyzer.backend != backend:
+            print(f"{backend:12s} unavailable or failed the load-time parity check")
+            failed = True
+            continue
+        with torch.no_grad():
+            logits = analyzer.runner(batch)
+        rows.append((backend, logits, p50_latency_ms(analyzer.runner, batch, args.runs), weight_size_mb(analyzer)))
+
+    # ---------- parity / latency / size ----------
+    eager_latency, eager_size = rows[0][2], rows[0][3]
+    print(f"\n{len(paths)} images")
+    for name, logits, latency, size in rows:
+        parity = compare_logits(reference, logits)
+        size_text = f"{size:.1f} MB" if size is not None else "n/a"
+        print(
+            f"{name:12s} top-1 agreement {parity['top1_agreement'] * 100:5.1f}% | "
+            f"max logit diff {parity['max_abs_logit_diff']:.2e} | "
+            f"max prob diff {parity['max_abs_prob_diff']:.2e} | "
+            f"p50 {latency:6.1f} ms/image ({eager_latency / latency:.2f}x) | weights {size_text}"
+            + (f" ({eager_size / size:.2f}x smaller)" if size and name != "eager" else "")
+        )
+        failed = failed or (name != "int8" and parity["top1_agreement"] < 1.0)
+
+    # ---------- accuracy per class ----------
+    if labels is None:
+        print("\n(no class sub-folders found, skipping per-class accuracy)")
+    else:
+        eager_acc = per_class_accuracy(reference, labels, n_classes)
+        print("\nAccuracy per class (drift vs eager):")
+        for name, logits, _, _ in rows:
+            accuracy = per_class_accuracy(logits, labels, n_classes)
+            cells = []
+            for c in range(n_classes):
+                if accuracy[c] is None:
+                    cells.append(f"{eager.class_names[c]}: n/a")
+                else:
+                    drift = (accuracy[c] - eager_acc[c]) * 100
+                    cells.append(f"{eager.class_names[c]}: {accuracy[c] * 100:.1f}% ({drift:+.1f})")
+            print(f"{name:12s} " + " | ".join(cells))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import io
+import copy
+import warnings
+import torch
+import numpy as np
+from PIL import Image
+
+from inference_cache import weights_fingerprint
+
+# ==========================================
+# ⚡ OPTIMIZED INFERENCE BACKENDS (DR CLASSIFIER)
+# ==========================================
+# "eager"       -> plain PyTorch module (default)
+# "torchscript" -> traced, frozen and inference-optimized graph (conv/bn fused)
+# "onnx"        -> ONNX Runtime CPU session (needs `pip install onnx onnxruntime`)
+# "int8"        -> post-training static quantization (FX graph mode), calibrated
+#                  on the fundus images in DIAGNO_DR_CALIBRATION_DIR (also
+#                  used for the parity check of the other backends)
+#
+# Exported graphs are cached next to the weights (or in DIAGNO_DR_EXPORT_DIR),
+# keyed by the weights fingerprint, so they are rebuilt when the weights change.
+BACKENDS = ("eager", "torchscript", "onnx", "int8")
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+INPUT_SHAPE = (3, 224, 224)
+
+def _export_path(model_path, export_dir, backend):
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    ext = ".ts" if backend == "torchscript" else ".onnx"
+    folder = export_dir or os.path.dirname(os.path.abspath(model_path))
+    return os.path.join(folder, f"{stem}.{weights_fingerprint(model_path)}{ext}")
+
+def _example_batch(batch_size=2, seed=0):
+    """Fixed, normalized-looking input used for tracing and the parity check."""
+    generator = torch.Generator().manual_seed(seed)
+    return torch.randn((batch_size,) + INPUT_SHAPE, generator=generator)
+
+# ================= TORCHSCRIPT =================
+def build_torchscript(model, path):
+    with warnings.catch_warnings():
+        # torch.jit is deprecated upstream but still the lightest CPU graph runtime
+        warnings.simplefilter("ignore", FutureWarning)
+        if os.path.exists(path):
+            frozen = torch.jit.load(path, map_location="cpu")
+        else:
+            with torch.no_grad():
+                frozen = torch.jit.freeze(torch.jit.trace(model, _example_batch()).eval())
+            try:
+                # Saved before optimize_for_inference: prepacked ops do not serialize
+                torch.jit.save(frozen, path)
+            except OSError as e:
+                print(f"⚠️ Could not cache TorchScript graph at {path}: {e}")
+        return torch.jit.optimize_for_inference(frozen)
+
+# ================= ONNX RUNTIME =================
+class OnnxRunner:
+    """Callable wrapper so an ONNX Runtime session looks like a torch module."""
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        logits = self.session.run(None, {self.input_name: batch.cpu().numpy().astype(np.float32)})[0]
+        return torch.from_numpy(logits)
+
+def build_onnx(model, path, threads=None):
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        torch.onnx.export(
+            model, (_example_batch(),), tmp_path,
+            input_names=["input"], output_names=["logits"],
+            dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=17, dynamo=False
+        )
+        os.replace(tmp_path, path)
+    return OnnxRunner(path, threads)
+
+# ================= INT8 (STATIC PTQ) =================
+def list_images(folder):
+    """Image files under `folder` (recursively), sorted for a reproducible order."""
+    found = []
+    for root, _, files in os.walk(folder):
+        found += [os.path.join(root, f) for f in files if f.lower().endswith(IMAGE_EXTS)]
+    return sorted(found)
+
+def load_calibration_batch(folder, transform, limit=64):
+    """Preprocessed tensor batch of up to `limit` calibration images (None if none found)."""
+    paths = list_images(folder)[:limit] if folder and os.path.isdir(folder) else []
+    if not paths:
+        return None
+    return torch.stack([transform(Image.open(p).convert("RGB")) for p in paths])
+
+def build_int8(model, calibration_batch):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    engines = torch.backends.quantized.supported_engines
+    engine = "x86" if "x86" in engines else ("fbgemm" if "fbgemm" in engines else "qnnpack")
+    torch.backends.quantized.engine = engine
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        # The fp32 model stays untouched (parity checks and fallback use it)
+        float_model = copy.deepcopy(model).cpu().eval()
+        prepared = prepare_fx(float_model, get_default_qconfig_mapping(engine), example_inputs=(calibration_batch[:1],))
+        with torch.no_grad():
+            for chunk in calibration_batch.split(8):
+                prepared(chunk) # observers record activation ranges
+        return convert_fx(prepared)
+
+def serialized_size(module):
+    """Bytes of the module's state_dict when saved (approximate weight memory)."""
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.tell()
+
+# ================= PARITY =================
+def compare_logits(reference, candidate):
+    """Max absolute logit difference and top-1 agreement between two outputs."""
+    ref_probs = torch.softmax(reference.float(), dim=1)
+    cand_probs = torch.softmax(candidate.float(), dim=1)
+    return {
+        "max_abs_logit_diff": float((reference.float() - candidate.float()).abs().max()),
+        "max_abs_prob_diff": float((ref_probs - cand_probs).abs().max()),
+        "top1_agreement": float((ref_probs.argmax(1) == cand_probs.argmax(1)).float().mean())
+    }
+
+def check_parity(model, runner, batch=None):
+    batch = _example_batch() if batch is None else batch
+    with torch.no_grad():
+        return compare_logits(model(batch), runner(batch))
+
+def worst_parity(model, runner, batches):
+    """check_parity over several batches, keeping the largest drift / lowest agreement."""
+    results = [check_parity(model, runner, batch) for batch in batches]
+    return {
+        "max_abs_logit_diff": max(r["max_abs_logit_diff"] for r in results),
+        "max_abs_prob_diff": max(r["max_abs_prob_diff"] for r in results),
+        "top1_agreement": min(r["top1_agreement"] for r in results)
+    }
+
+# ================= FACTORY =================
+def build_runner(model, backend, model_path, export_dir=None, atol=1e-3, threads=None,
+                 calibration=None, min_agreement=0.9):
+    """
+    Returns (runner, backend_used). `runner(batch_tensor) -> logits tensor`.
+    Falls back to the eager model (with a warning) when the backend is
+    unavailable or its output drifts from eager by more than `atol`.
+    `calibration` is a preprocessed batch of sample fundus images
+    (load_calibration_batch): TorchScript / ONNX are checked on it as well
+    as on random inputs, otherwise only on random inputs (run dr_parity.py
+    offline on real images then). int8 is lossy, so it is gated on top-1
+    agreement with eager over `calibration` (>= `min_agreement`) instead.
+    """
+    backend = (backend or "eager").lower()
+    if backend == "eager":
+        return model, "eager"
+    if backend not in BACKENDS:
+        print(f"Warning: unknown DR backend '{backend}', using eager")
+        return model, "eager"
+
+    # Exported graphs are CPU graphs; eager stays on GPU when there is one
+    if next(model.parameters()).is_cuda:
+        print(f"Warning: DR backend '{backend}' is CPU-only, using eager on GPU")
+        return model, "eager"
+
+    if backend == "int8" and calibration is None:
+        print("Warning: DR backend 'int8' needs calibration images (DIAGNO_DR_CALIBRATION_DIR), using eager")
+        return model, "eager"
+
+    try:
+        if backend == "torchscript":
+            runner = build_torchscript(model, _export_path(model_path, export_dir, backend))
+        elif backend == "onnx":
+            runner = build_onnx(model, _export_path(model_path, export_dir, backend), threads)
+        else:
+            runner = build_int8(model, calibration)
+    except ImportError as e:
+        print(f"Warning: DR backend '{backend}' unavailable ({e}), using eager")
+        return model, "eager"
+    except Exception as e:
+        print(f"Warning: DR backend '{backend}' export failed ({e}), using eager")
+        return model, "eager"
+
+    if backend == "int8":
+        parity = check_parity(model, runner, calibration)
+        passed = parity["top1_agreement"] >= min_agreement
+    else:
+        batches = [_example_batch()] + ([calibration] if calibration is not None else [])
+        parity = worst_parity(model, runner, batches)
+        passed = parity["max_abs_logit_diff"] <= atol and parity["top1_agreement"] == 1.0
+    if not passed:
+        print(f"Warning: DR backend '{backend}' failed parity {parity}, using eager")
+        return model, "eager"
+
+    checked_on = "random inputs" if calibration is None else f"{len(calibration)} sample images"
+    print(f"✓ DR backend '{backend}' ready on {checked_on} (max logit diff {parity['max_abs_logit_diff']:.2e}, "
+          f"top-1 agreement {parity['top1_agreement'] * 100:.1f}%)")
+    return runner, backend
@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+from config import FILTER_PYRAMID_MIN_SIGMA
+
+# ==========================================
+# 🎛️ FUSED FILTER BANK (ADVANCED MODE VARIANTS)
+# ==========================================
+# All advanced-mode variants of one image are produced in one pass that
+# shares its intermediates: the normalized image feeds CLAHE, the CLAHE
+# grayscale feeds the colormap and Retinex, and Retinex takes the log of
+# its input once for all scales.
+# The Retinex surrounds (sigma up to 250) are not blurred at full
+# resolution: a blur pyramid (repeated 2x area downsampling) is built once
+# and each sigma is blurred on the coarsest level where it still spans
+# FILTER_PYRAMID_MIN_SIGMA pixels, then upsampled back. A full-resolution
+# sigma-250 GaussianBlur alone takes ~30 s on a 2000x2500 radiograph.
+RETINEX_SIGMAS = (15, 80, 250)
+
+def blur_pyramid(img, levels):
+    """[img, img/2, img/4, ...] (float32, area-downsampled), `levels` + 1 entries."""
+    pyramid = [img.astype(np.float32)]
+    for _ in range(levels):
+        h, w = pyramid[-1].shape[:2]
+        if min(h, w) < 2:
+            break
+        pyramid.append(cv2.resize(pyramid[-1], ((w + 1) // 2, (h + 1) // 2), interpolation=cv2.INTER_AREA))
+    return pyramid
+
+def pyramid_level(sigma, min_sigma):
+    """Coarsest pyramid level on which `sigma` still spans at least `min_sigma` pixels."""
+    if not min_sigma:
+        return 0
+    level = 0
+    while sigma / 2 ** (level + 1) >= min_sigma:
+        level += 1
+    return level
+
+def pyramid_gaussian(pyramid, sigma, min_sigma=FILTER_PYRAMID_MIN_SIGMA):
+    """
+    Gaussian blur of pyramid[0] with `sigma` (float32, full size), computed
+    on a coarser level and upsampled. The smoothing already done by the
+    area downsampling ((4^k - 1) / 12 of variance at level k) is taken off
+    the remaining blur.
+    """
+    level = min(pyramid_level(sigma, min_sigma), len(pyramid) - 1)
+    if level == 0:
+        return cv2.GaussianBlur(pyramid[0], (0, 0), sigma)
+
+    scale = 2 ** level
+    residual = np.sqrt(max(sigma ** 2 - (4 ** level - 1) / 12.0, 0.0)) / scale
+    small = cv2.GaussianBlur(pyramid[level], (0, 0), residual)
+    h, w = pyramid[0].shape[:2]
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+
+class FilterBank:
+    """
+    Builds the advanced-mode variants (original, brightness, clahe,
+    jet_colormap, retinex) of an RGB uint8 image.
+    Stateless between calls, so one instance serves every worker thread.
+    """
+    def __init__(self, clahe_clip=2.0, clahe_tiles=(8, 8), retinex_sigmas=RETINEX_SIGMAS,
+                 min_sigma=FILTER_PYRAMID_MIN_SIGMA):
+        self.clahe_clip = clahe_clip
+        self.clahe_tiles = clahe_tiles
+        self.retinex_sigmas = tuple(retinex_sigmas)
+        self.min_sigma = min_sigma
+
+    def apply(self, img):
+        # A: Brightness & Contrast
+        A = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
+
+        # B: CLAHE (its grayscale is shared by the variants below)
+        gray = cv2.cvtColor(A, cv2.COLOR_RGB2GRAY)
+        # CLAHE objects are not thread-safe: one per call (cheap)
+        clahe_gray = cv2.createCLAHE(self.clahe_clip, self.clahe_tiles).apply(gray)
+        B = cv2.cvtColor(clahe_gray, cv2.COLOR_GRAY2RGB)
+
+        # D: Jet Colormap
+        D = cv2.applyColorMap(clahe_gray, cv2.COLORMAP_JET)
+
+        # F: Retinex
+        F = cv2.cvtColor(self.retinex(clahe_gray), cv2.COLOR_GRAY2RGB)
+
+        return {
+            "original": img,
+            "brightness": A,
+            "clahe": B,
+            "jet_colormap": D,
+            "retinex": F
+        }
+
+    def retinex(self, gray):
+        """
+        Multi-scale Retinex of a uint8 grayscale image:
+        sum over sigmas of log(1 + I) - log(1 + G_sigma * I), stretched to 0-255.
+        """
+        levels = max(pyramid_level(s, self.min_sigma) for s in self.retinex_sigmas)
+        pyramid = blur_pyramid(gray, levels)
+
+        r = np.log1p(pyramid[0]) * len(self.retinex_sigmas)
+        for sigma in self.retinex_sigmas:
+            r -= np.log1p(pyramid_gaussian(pyramid, sigma, self.min_sigma))
+        return cv2.normalize(r, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+
+default_filter_bank = FilterBank()
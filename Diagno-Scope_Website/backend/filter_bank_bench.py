@@ -0,0 +1,79 @@
+"""
+Speed and output agreement of filter_bank.FilterBank vs the former
+per-variant apply_filters (full-resolution Retinex blurs).
+
+    python filter_bank_bench.py [radiographs ...] [--runs 3] [--min-sigma 4]
+
+Reports the median time of both for every image and, per variant, the mean
+and max absolute difference of the uint8 outputs. Without images, a
+synthetic 2000x2500 radiograph is used.
+"""
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from filter_bank import FilterBank
+
+def reference_filters(img):
+    """apply_filters as it was before the filter bank (kept for comparison)."""
+    A = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
+    gray = cv2.cvtColor(A, cv2.COLOR_RGB2GRAY)
+    clahe = cv2.createCLAHE(2.0, (8,8))
+    B = cv2.cvtColor(clahe.apply(gray), cv2.COLOR_GRAY2RGB)
+    D = cv2.applyColorMap(B[:,:,0], cv2.COLORMAP_JET)
+
+    def retinex(img):
+        sigmas = [15, 80, 250]
+        r = np.zeros_like(img, dtype=np.float32)
+        for s in sigmas:
+            r += np.log1p(img) - np.log1p(cv2.GaussianBlur(img, (0,0), s))
+        return cv2.normalize(r, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+
+    F = cv2.cvtColor(retinex(B[:,:,0]), cv2.COLOR_GRAY2RGB)
+    return {"original": img, "brightness": A, "clahe": B, "jet_colormap": D, "retinex": F}
+
+def synthetic_radiograph(width=2000, height=2500, seed=0):
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width), 30, np.uint8)
+    for _ in range(6):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        axes = (int(rng.integers(80, 250)), int(rng.integers(400, 1000)))
+        cv2.ellipse(img, (x, y), axes, float(rng.integers(0, 180)), 0, 360, int(rng.integers(120, 230)), -1)
+    img = cv2.GaussianBlur(img, (0, 0), 6)
+    img = cv2.add(img, rng.integers(0, 12, img.shape).astype(np.uint8))
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
+
+def timed(fn, runs):
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--min-sigma", type=float, default=4.0, help="FILTER_PYRAMID_MIN_SIGMA to benchmark (0 = no pyramid)")
+    args = parser.parse_args()
+
+    bank = FilterBank(min_sigma=args.min_sigma)
+    if args.images:
+        samples = [(path, cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)) for path in args.images]
+    else:
+        samples = [("synthetic", synthetic_radiograph())]
+
+    for label, img in samples:
+        reference, t_ref = timed(lambda: reference_filters(img), 1) # minutes on large images
+        variants, t_new = timed(lambda: bank.apply(img), args.runs)
+        print(f"\n{label} ({img.shape[1]}x{img.shape[0]}): reference {t_ref * 1000:7.0f} ms | "
+              f"filter bank {t_new * 1000:6.0f} ms ({t_ref / t_new:5.1f}x)")
+        for name, ref in reference.items():
+            diff = np.abs(ref.astype(np.int16) - variants[name].astype(np.int16))
+            print(f"  {name:13s} mean |diff| {diff.mean():6.2f}  max {int(diff.max()):3d}")
+
+if __name__ == "__main__":
+    main()
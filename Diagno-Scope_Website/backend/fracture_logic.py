@@ -0,0 +1,187 @@
+import threading
+import cv2
+import numpy as np
+
+from image_io import img_to_base64
+from filter_bank import default_filter_bank
+from variant_policy import smart_policy, image_features
+
+# ==========================================
+# 🛠️ HELPER: FILTERS
+# ==========================================
+def apply_filters(img):
+    """Advanced-mode variants of an RGB image, built in one pass by the shared FilterBank."""
+    return default_filter_bank.apply(img)
+
+def apply_bone_mask(img):
+    """
+    Masks out background to focus on the bone area.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    _, mask = cv2.threshold(gray, 20, 255, cv2.THRESH_BINARY)
+    # Morphological cleanup
+    kernel = np.ones((5,5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    masked_img = cv2.bitwise_and(img, img, mask=mask)
+    return masked_img
+
+def max_confidence(result):
+    """Highest box confidence of a single YOLO result (0.0 if nothing detected)."""
+    if len(result.boxes) > 0:
+        return float(result.boxes.conf.max().item())
+    return 0.0
+
+def encode_detections(result, kind="detections", encoding=None):
+    """Annotates a YOLO result and encodes it for the response."""
+    # plot() draws on the RGB input array, so the annotated image is RGB too
+    return img_to_base64(result.plot(), kind, encoding)
+
+# ==========================================
+# 🦴 CORE ENGINE: FRACTURE DETECTION
+# ==========================================
+class FractureAnalyzer:
+    def __init__(self, model_path):
+        # Imported here so importing this module stays cheap
+        from ultralytics import YOLO
+
+        print(f"⏳ Loading Fracture Model from: {model_path}")
+        self.model = YOLO(model_path)
+        # The ultralytics predictor is not thread-safe; worker threads take turns
+        self._lock = threading.Lock()
+
+    def run_yolo_batch(self, imgs):
+        """
+        Runs YOLO on several images in a single batched forward pass.
+        Returns the raw ultralytics results (one per image) so callers
+        can decide which ones are worth annotating.
+        """
+        with self._lock:
+            return self.model(list(imgs), conf=0.15) # Lower conf thresh to detect deeper fractures
+
+    def run_yolo(self, img):
+        """
+        Runs YOLO and returns:
+        - annotated_image (numpy)
+        - max_confidence (float)
+        """
+        result = self.run_yolo_batch([img])[0]
+        return result.plot(), max_confidence(result)
+
+    def smart_analyze(self, img):
+        """
+        Applies logic:
+        1. Bone Masking
+        2. Filter Variations (CLAHE, Sharpen, Brightness)
+        3. Run Inference on the variants the policy plans, likely winners first
+        4. Select BEST result based on Confidence
+        The policy (variant_policy.smart_policy) picks the batches from win
+        statistics of similar radiographs: the 1-2 usual winners once it has
+        enough history (the rest only if they detect nothing), otherwise the
+        best variants first and the rest unless one reached SMART_EARLY_EXIT_CONF.
+        """
+        variants = SmartVariants(img)
+        features = image_features(img)
+        stages, mode = smart_policy.plan(features, SmartVariants.NAMES)
+
+        results = {}
+        early_exit = False
+        for stage in filter(None, stages):
+            batch_results = self.run_yolo_batch([variants[name] for name in stage])
+            results.update(zip(stage, batch_results))
+
+            if smart_policy.stop_early(mode, [max_confidence(r) for r in batch_results]):
+                early_exit = len(results) < len(SmartVariants.NAMES)
+                break
+
+        best_variant, best_conf = pick_best_variant(variants, results)
+        confs = {name: max_confidence(result) for name, result in results.items()}
+        smart_policy.record(features, confs, best_variant if best_conf > 0 else None, early_exit, mode)
+
+        # Only the winning variant gets annotated (no extra inference in the
+        # fallback: it reuses a pass that already ran)
+        best_img = results[best_variant].plot()
+
+        return best_img, best_variant, best_conf
+
+# ==========================================
+# 🔀 SMART MODE: VARIANTS
+# ==========================================
+RAW_VARIANT = "Raw Model (Standard)"
+EDGE_BONUS = 0.05 # max score bonus for edge density (prefers sharper images)
+
+class SmartVariants:
+    """
+    The smart-mode variants of one image, built on first access
+    (most searches stop before they need all of them).
+    """
+    NAMES = (
+        RAW_VARIANT,
+        "Masked (Background Removed)",
+        "CLAHE (Enhanced Contrast)",
+        "Sharpened",
+        "Brightness Boost"
+    )
+
+    def __init__(self, img):
+        self.img = img
+        self._masked = None
+        self._built = {}
+
+    @property
+    def masked(self):
+        # Base Image with Bone Mask (shared by every variant but the raw one)
+        if self._masked is None:
+            self._masked = apply_bone_mask(self.img)
+        return self._masked
+
+    def __getitem__(self, name):
+        if name not in self._built:
+            self._built[name] = self._build(name)
+        return self._built[name]
+
+    def _build(self, name):
+        if name == RAW_VARIANT:
+            # Variant 1: Raw Model (Standard YOLO)
+            return self.img
+        if name == "Masked (Background Removed)":
+            # Variant 2: Original Masked
+            return self.masked
+        if name == "CLAHE (Enhanced Contrast)":
+            # Variant 3: CLAHE (Contrast Limited Adaptive Histogram Equalization)
+            gray = cv2.cvtColor(self.masked, cv2.COLOR_RGB2GRAY)
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+            return cv2.cvtColor(clahe.apply(gray), cv2.COLOR_GRAY2RGB)
+        if name == "Sharpened":
+            # Variant 4: Sharpening
+            kernel = np.array([[0, -1, 0], [-1, 5,-1], [0, -1, 0]])
+            return cv2.filter2D(self.masked, -1, kernel)
+        if name == "Brightness Boost":
+            # Variant 5: Brightness Boost
+            return cv2.convertScaleAbs(self.masked, alpha=1.2, beta=10)
+        raise KeyError(name)
+
+def edge_density(img):
+    edges = cv2.Canny(img, 100, 200)
+    return float(np.count_nonzero(edges) / edges.size)
+
+def pick_best_variant(variants, results):
+    """
+    (name, score) of the best evaluated variant: its confidence plus a
+    small edge-density bonus (only if a detection was actually made).
+    Canny only runs for variants close enough to the top to win with it.
+    Nothing detected -> the raw pass (or the first evaluated one), score 0.0.
+    """
+    confs = {name: max_confidence(result) for name, result in results.items()}
+    top = max(confs.values(), default=0.0)
+    if top <= 0:
+        return (RAW_VARIANT if RAW_VARIANT in results else next(iter(results))), 0.0
+
+    best_variant, best_score = None, -1.0
+    for name, conf in confs.items():
+        if conf <= 0 or conf + EDGE_BONUS < top:
+            continue
+        score = conf + edge_density(variants[name]) * EDGE_BONUS
+        if score > best_score:
+            best_variant, best_score = name, score
+    return best_variant, best_score
@@ -0,0 +1,239 @@
+import base64
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from config import IMAGE_DECODE_MAX_SIDE, IMAGE_ENCODING
+from dicom_io import as_file, is_dicom, DicomFile, frame_to_rgb
+
+# ==========================================
+# 🖼️ SHARED IMAGE I/O (UPLOADS IN, ENCODED IMAGES OUT)
+# ==========================================
+# Every service and engine decodes uploads and encodes result images here.
+# Images travel through the engines as RGB uint8 arrays:
+# - JPEG/PNG/... are decoded by cv2.imdecode straight into RGB (no PIL
+#   round trip), huge JPEGs at a reduced libjpeg scale if
+#   IMAGE_DECODE_MAX_SIDE is set
+# - DICOM goes through dicom_io (lazy frames, window/level LUT)
+# - outputs are encoded with one RGB->BGR conversion, base64'd from the
+#   encoder's buffer, in the format the EncodingPolicy picks for their kind
+_READ_RGB = getattr(cv2, "IMREAD_COLOR_RGB", None) # OpenCV >= 4.11
+_READ_REDUCED = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+def _decode_flags(reduce=1):
+    # Orientation is ignored on purpose: scans are analysed as stored
+    flags = _READ_REDUCED.get(reduce, cv2.IMREAD_COLOR) | cv2.IMREAD_IGNORE_ORIENTATION
+    if _READ_RGB is not None:
+        flags = (flags & ~cv2.IMREAD_COLOR) | _READ_RGB
+    return flags
+
+def jpeg_reduction(fp, max_side):
+    """Largest JPEG decode scale (1, 2, 4 or 8) that keeps the long side >= max_side."""
+    if not max_side:
+        return 1
+    try:
+        with Image.open(fp) as probe: # reads the header only
+            if probe.format != "JPEG":
+                return 1
+            long_side = max(probe.size)
+    except Exception:
+        return 1
+    finally:
+        fp.seek(0)
+
+    reduce = 1
+    while reduce < 8 and long_side // (reduce * 2) >= max_side:
+        reduce *= 2
+    return reduce
+
+def decode_image(data, reduce=1):
+    """RGB uint8 array from encoded image bytes (None if OpenCV cannot read them)."""
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), _decode_flags(reduce))
+    if img is not None and _READ_RGB is None:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return img
+
+def _decode_file(fp, max_side):
+    img = decode_image(fp.read(), jpeg_reduction(fp, max_side))
+    if img is None:
+        # Formats OpenCV does not read (e.g. GIF)
+        fp.seek(0)
+        img = np.array(Image.open(fp).convert("RGB"))
+    return img
+
+def process_image_file(file_content, filename: str, max_side=IMAGE_DECODE_MAX_SIDE) -> np.ndarray:
+    """Decodes one upload (raw bytes or a spooled file) into an RGB uint8 array, None on failure."""
+    try:
+        fp = as_file(file_content)
+        if is_dicom(filename, fp):
+            # Header first; only the first frame is decoded, then windowed via its LUT
+            return DicomFile(fp, filename).display_frame(0)
+        return _decode_file(fp, max_side)
+    except Exception as e:
+        print(f"Error processing file {filename}: {e}")
+        return None
+
+def read_image(path, max_side=IMAGE_DECODE_MAX_SIDE):
+    """process_image_file for a file on disk."""
+    with open(path, "rb") as f:
+        return process_image_file(f, path, max_side)
+
+def iter_series(uploads, max_side=IMAGE_DECODE_MAX_SIDE):
+    """
+    Yields (label, RGB uint8 image or None if unreadable) for every frame of
+    a series given as (filename, content) uploads: single-frame files,
+    multi-frame files or a mix. DICOM files are ordered by series and
+    InstanceNumber from their headers alone; other images keep the upload
+    order (after the DICOMs). Frames are decoded lazily as the iterator
+    advances.
+    """
+    dicoms, others = [], []
+    for filename, content in uploads:
+        fp = as_file(content)
+        try:
+            if is_dicom(filename, fp):
+                dicoms.append(DicomFile(fp, filename))
+            else:
+                others.append((filename, fp))
+        except Exception as e:
+            print(f"Error reading header of {filename}: {e}")
+            yield filename, None
+
+    luts = {} # one window LUT per series (and windowing)
+    for dicom in sorted(dicoms, key=lambda d: (d.series_uid, d.instance_number)):
+        try:
+            for i, frame in enumerate(dicom.frames()):
+                key = dicom.lut_key()
+                if key not in luts:
+                    luts[key] = dicom.window_lut(frame)
+                label = dicom.filename if dicom.frame_count == 1 else f"{dicom.filename}#{i + 1}"
+                yield label, frame_to_rgb(frame, luts[key])
+        except Exception as e:
+            print(f"Error decoding {dicom.filename}: {e}")
+            yield dicom.filename, None
+
+    for filename, fp in others:
+        try:
+            yield filename, _decode_file(fp, max_side)
+        except Exception as e:
+            print(f"Error processing file {filename}: {e}")
+            yield filename, None
+
+# ---------- encoding ----------
+# Result image kinds an EncodingPolicy can configure separately
+ARTIFACT_KINDS = (
+    "detections", # YOLO plots (normal / smart)
+    "variants",   # advanced-mode filter variants
+    "overlay",    # tumor heatmap/segmentation/crop, DR vessel + lesion maps
+    "original"    # DR display copy of the input
+)
+ENCODER_EXT = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+class ImageEncoding:
+    """
+    One encoder setting, written "format[:value][@max_side]":
+    - png[:0-9]     lossless, value = zlib level (none: OpenCV's default)
+    - webp[:1-100]  lossless without a value, else lossy at that quality
+    - jpeg[:1-100]  quality (default 90), for previews
+    - @max_side     downscales the long side first (thumbnails)
+    e.g. "png:1", "webp", "jpeg:80@512".
+    """
+    def __init__(self, format="png", value=None, max_side=0):
+        self.format = format
+        self.value = value
+        self.max_side = max_side
+
+    @classmethod
+    def parse(cls, spec):
+        spec = spec.strip().lower()
+        spec, _, max_side = spec.partition("@")
+        format, _, value = spec.partition(":")
+        format = "jpeg" if format == "jpg" else format
+        if format not in ENCODER_EXT:
+            raise ValueError(f"Unknown image format '{format}' (png, webp or jpeg)")
+        try:
+            value = int(value) if value else None
+            max_side = int(max_side) if max_side else 0
+        except ValueError:
+            raise ValueError(f"Invalid image encoding '{spec}'")
+
+        limits = {"png": (0, 9), "webp": (1, 100), "jpeg": (1, 100)}[format]
+        if value is not None and not limits[0] <= value <= limits[1]:
+            raise ValueError(f"{format} value must be in {limits[0]}-{limits[1]}")
+        if max_side < 0:
+            raise ValueError("max_side must be positive")
+        return cls(format, value, max_side)
+
+    def params(self):
+        if self.format == "png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.value] if self.value is not None else []
+        if self.format == "webp":
+            return [cv2.IMWRITE_WEBP_QUALITY, self.value if self.value is not None else 101] # > 100: lossless
+        return [cv2.IMWRITE_JPEG_QUALITY, self.value if self.value is not None else 90]
+
+    def encode(self, img):
+        """Encoded bytes buffer (numpy) of an RGB (or grayscale) uint8 array."""
+        h, w = img.shape[:2]
+        if self.max_side and max(h, w) > self.max_side:
+            scale = self.max_side / max(h, w)
+            img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+        bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR) if img.ndim == 3 else img
+        ok, buffer = cv2.imencode(ENCODER_EXT[self.format], bgr, self.params())
+        if not ok:
+            raise ValueError(f"{self.format.upper()} encoding failed")
+        return buffer
+
+    def __str__(self):
+        spec = self.format if self.value is None else f"{self.format}:{self.value}"
+        return f"{spec}@{self.max_side}" if self.max_side else spec
+
+class EncodingPolicy:
+    """
+    ImageEncoding per artifact kind, "default" covering kinds not listed.
+    Written "kind=encoding,kind=encoding" (a bare encoding sets the default),
+    e.g. "default=png:1,variants=jpeg:80@768,overlay=webp".
+    """
+    def __init__(self, encodings):
+        self.encodings = encodings
+
+    @classmethod
+    def parse(cls, spec, base=None):
+        """Policy from `spec`; kinds it does not mention keep their encoding in `base`."""
+        encodings = dict(base.encodings) if base is not None else {"default": ImageEncoding()}
+        for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+            kind, _, encoding = item.rpartition("=")
+            kind = kind.strip().lower() or "default"
+            if kind != "default" and kind not in ARTIFACT_KINDS:
+                raise ValueError(f"Unknown artifact kind '{kind}' ({', '.join(ARTIFACT_KINDS)})")
+            encodings[kind] = ImageEncoding.parse(encoding)
+        return cls(encodings)
+
+    def for_kind(self, kind):
+        return self.encodings.get(kind) or self.encodings["default"]
+
+    @property
+    def key(self):
+        """Canonical text form (part of inference cache keys)."""
+        return ",".join(f"{kind}={encoding}" for kind, encoding in sorted(self.encodings.items()))
+
+    def __str__(self):
+        return self.key
+
+# Operator default (DIAGNO_IMAGE_ENCODING); requests may override it per kind
+default_encoding = EncodingPolicy.parse(IMAGE_ENCODING)
+
+def request_encoding(spec):
+    """Policy for one request's `encoding` form field (ValueError if invalid)."""
+    return EncodingPolicy.parse(spec, default_encoding) if spec else default_encoding
+
+def encode_image(img, kind="default", encoding=None):
+    """Bytes buffer of an RGB uint8 array, encoded as `encoding` (an EncodingPolicy) says for `kind`."""
+    return (encoding or default_encoding).for_kind(kind).encode(img)
+
+def img_to_base64(img, kind="default", encoding=None):
+    """Base64 of an RGB uint8 array encoded per `encoding` for `kind` (PIL images are accepted too)."""
+    if isinstance(img, Image.Image):
+        img = np.asarray(img.convert("RGB"))
+    return base64.b64encode(encode_image(img, kind, encoding)).decode("ascii")
@@ -0,0 +1,102 @@
+import os
+import hashlib
+import threading
+import numpy as np
+
+from result_store import ResultStore
+import config
+from config import CACHE_ENABLED, CACHE_MAX_MB, CACHE_TTL_SECONDS, CACHE_DIR
+
+# ==========================================
+# ♻️ CONTENT-HASH INFERENCE CACHE
+# ==========================================
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+def weights_fingerprint(path):
+    """
+    Short content hash of a model weights file.
+    Memoised per (path, size, mtime) so swapping weights invalidates the cache.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+    with _fingerprint_lock:
+        if memo_key not in _fingerprints:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            _fingerprints[memo_key] = digest.hexdigest()[:16]
+        return _fingerprints[memo_key]
+
+# Settings that change the response of an analysis type for the same pixels
+# and weights (the DR backend: int8 is lossy; working resolutions; filter
+# bank pyramid; smart-mode plan). They are part of the key, so changing one
+# never serves results computed under the old value.
+# Smart mode: the variants it evaluates depend on the learned statistics (and
+# on the random explore draw), so a cached smart result is the one of the
+# plan that ran first; a new search could pick another near-tied variant.
+OUTPUT_SETTINGS = {
+    "advanced": ("FILTER_PYRAMID_MIN_SIGMA",),
+    "smart": (
+        "SMART_EARLY_EXIT_CONF", "SMART_FIRST_STAGE", "SMART_POLICY_TOP_K",
+        "SMART_POLICY_MIN_SAMPLES", "SMART_POLICY_EXPLORE"
+    ),
+    "dr": ("DR_BACKEND", "DR_ANALYSIS_MAX_SIDE", "DR_DISPLAY_MAX_SIDE", "VESSEL_MAX_SIDE")
+}
+
+def settings_key(analysis_type):
+    """'NAME=value,...' of the OUTPUT_SETTINGS of `analysis_type` ('' if none)."""
+    return ",".join(f"{name}={getattr(config, name)}" for name in OUTPUT_SETTINGS.get(analysis_type, ()))
+
+def pixel_cache_key(img, analysis_type, fingerprint, variant=""):
+    """Hash of the decoded pixels (+ shape/dtype), the analysis type, the model weights and the output settings."""
+    digest = hashlib.sha256()
+    digest.update(f"{analysis_type}|{fingerprint}|{variant}|{img.shape}|{img.dtype}|".encode())
+    digest.update(np.ascontiguousarray(img))
+    return digest.hexdigest()
+
+class InferenceCache:
+    """
+    Maps decoded scans to their finished per-file responses.
+
+    `weights` maps each analysis_type to the weights file it depends on.
+    Memory and disk tiers (and eviction) come from ResultStore.
+    """
+    def __init__(self, name, weights):
+        self.weights = weights
+        self.enabled = CACHE_ENABLED
+        self.store = ResultStore(name, CACHE_MAX_MB * 1024 * 1024, CACHE_TTL_SECONDS, CACHE_DIR)
+
+    def key(self, img, analysis_type, encoding=None):
+        path = self.weights.get(analysis_type)
+        fingerprint = weights_fingerprint(path) if path else "none"
+        variant = f"{encoding.key if encoding is not None else ''}|{settings_key(analysis_type)}"
+        return pixel_cache_key(img, analysis_type, fingerprint, variant)
+
+    async def lookup_or_run(self, pool, analysis_type, filename, img, analyze_image, encoding=None):
+        """
+        Returns the cached response for `img` or runs
+        `analyze_image(analysis_type, filename, img, encoding)` and caches its result.
+        Responses are cached per image encoding policy (their images differ).
+        Hashing runs on `pool` (an InferencePool) to keep the event loop free.
+        """
+        if not self.enabled:
+            return await analyze_image(analysis_type, filename, img, encoding)
+
+        key = await pool.run(self.key, img, analysis_type, encoding)
+        cached = self.store.get(key)
+        if cached is not None:
+            return {**cached, "filename": filename, "cache_hit": True}
+
+        response = await analyze_image(analysis_type, filename, img, encoding)
+        if "error" not in response:
+            self.store[key] = {k: v for k, v in response.items() if k != "filename"}
+        return response
+
+    def snapshot(self):
+        return {"enabled": self.enabled, **self.store.snapshot()}
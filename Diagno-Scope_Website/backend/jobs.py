@@ -0,0 +1,169 @@
+import asyncio
+import functools
+import uuid
+
+from config import JOB_MAX_ACTIVE, JOB_MAX_QUEUED, JOB_OVERLOAD_TIMEOUT_SECONDS
+from workers import PoolOverloaded
+
+# ==========================================
+# 🗂️ BACKGROUND ANALYSIS JOBS
+# ==========================================
+def close_uploads(uploads):
+    """Closes the spooled uploads (see dicom_io.spool_upload): they hold memory or a temp file."""
+    for _, content in uploads:
+        if hasattr(content, "close"):
+            content.close()
+
+class JobRunner:
+    """
+    Runs /analyze jobs in the background and records progress in `results_db`.
+
+    A job moves through:
+      queued    -> accepted, waiting for a free slot
+      running   -> first file is being analysed
+      partial   -> some files finished (their results are already readable)
+      completed -> every file finished
+      failed    -> the job crashed outside of per-file error handling
+
+    `process_upload(analysis_type, filename, content)` is the per-file
+    coroutine of the owning API module and returns that file's response dict.
+    With an `artifacts` store (ArtifactStore) the images of every recorded
+    response are moved there and replaced by references.
+    """
+    RETRY_DELAY = 0.25 # seconds to wait when the worker pool is saturated
+
+    def __init__(self, results_db, max_active=JOB_MAX_ACTIVE, max_queued=JOB_MAX_QUEUED, artifacts=None,
+                 overload_timeout=JOB_OVERLOAD_TIMEOUT_SECONDS):
+        self.results_db = results_db
+        self.artifacts = artifacts
+        self.max_active = max(1, int(max_active))
+        self.max_queued = max(1, int(max_queued))
+        self.overload_timeout = overload_timeout
+
+        self._slots = None
+        self._loop = None
+        self._tasks = set() # strong refs so running jobs are not garbage collected
+
+    def submit(self, analysis_type, uploads, process_upload, root_path=""):
+        """
+        uploads: list of (filename, bytes or spooled file) taken from the request;
+        file objects are closed when the job ends.
+        root_path: mount prefix of the submitting app (request.scope["root_path"]),
+        so artifact URLs point at this app's routes when it is mounted.
+        Returns the new job_id; raises PoolOverloaded when too many jobs wait
+        (the uploads are closed then).
+        """
+        return self._start(analysis_type, uploads, functools.partial(self._run_files, uploads, process_upload, root_path))
+
+    def submit_study(self, analysis_type, uploads, process_study, root_path=""):
+        """
+        Like submit, but the uploads are the slices of one study and are
+        analysed together: `process_study(analysis_type, uploads)` returns
+        {"results": [per-slice responses], "summary": {...}}. The job only
+        goes from running to completed (no partial results).
+        """
+        return self._start(analysis_type, uploads, functools.partial(self._run_study, uploads, process_study, root_path))
+
+    def check_capacity(self):
+        """Raises PoolOverloaded if a new job would be rejected (call before spooling uploads)."""
+        if len(self._tasks) >= self.max_queued:
+            raise PoolOverloaded(f"{len(self._tasks)} jobs already queued")
+
+    def _start(self, analysis_type, uploads, work):
+        try:
+            # Again: the queue may have filled up while the uploads were spooled
+            self.check_capacity()
+        except PoolOverloaded:
+            close_uploads(uploads)
+            raise
+
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_active)
+            self._loop = loop
+
+        job_id = str(uuid.uuid4())
+        self.results_db[job_id] = {
+            "status": "queued",
+            "analysis_type": analysis_type,
+            "total_files": len(uploads),
+            "completed_files": 0,
+            "results": []
+        }
+
+        task = loop.create_task(self._run(job_id, analysis_type, uploads, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    async def _run(self, job_id, analysis_type, uploads, work):
+        job = self.results_db[job_id]
+        try:
+            async with self._slots:
+                job["status"] = "running"
+                await work(job_id, job, analysis_type)
+                job["status"] = "completed"
+        except Exception as e:
+            print(f"⚠️ Job {job_id} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            close_uploads(uploads)
+
+        self.results_db[job_id] = job
+
+    async def _run_files(self, uploads, process_upload, root_path, job_id, job, analysis_type):
+        for index, (filename, content) in enumerate(uploads):
+            response = await self._process(process_upload, analysis_type, filename, content)
+            job["results"].append(await self._externalize(job_id, index, response, root_path))
+            job["completed_files"] += 1
+            if job["completed_files"] < job["total_files"]:
+                job["status"] = "partial"
+            # Re-assign so a size-bounded store re-accounts the record
+            self.results_db[job_id] = job
+
+    async def _run_study(self, uploads, process_study, root_path, job_id, job, analysis_type):
+        # Still overloaded after overload_timeout: PoolOverloaded fails the job
+        study = await self._retry_overloaded(process_study, analysis_type, uploads)
+        job["results"] = [await self._externalize(job_id, i, r, root_path) for i, r in enumerate(study["results"])]
+        job["summary"] = study["summary"]
+        # Multi-frame uploads expand into several slices
+        job["total_files"] = job["completed_files"] = len(study["results"])
+
+    async def _externalize(self, job_id, index, response, root_path=""):
+        if self.artifacts is None:
+            return response
+        # base64 decoding + hashing of several MB stays off the event loop
+        return await asyncio.to_thread(self.artifacts.externalize, job_id, index, response, root_path)
+
+    async def _retry_overloaded(self, fn, *args):
+        """
+        Admitted jobs wait for capacity instead of failing mid-way: `fn(*args)`
+        is retried while the worker pool is saturated, for at most
+        `overload_timeout` seconds (then PoolOverloaded is raised).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.overload_timeout
+        while True:
+            try:
+                return await fn(*args)
+            except PoolOverloaded:
+                if loop.time() + self.RETRY_DELAY > deadline:
+                    raise
+                await asyncio.sleep(self.RETRY_DELAY)
+
+    async def _process(self, process_upload, analysis_type, filename, content):
+        try:
+            return await self._retry_overloaded(process_upload, analysis_type, filename, content)
+        except PoolOverloaded:
+            print(f"⚠️ Gave up on {filename}: worker pool still saturated after {self.overload_timeout:.0f}s")
+            return {
+                "filename": filename,
+                "error": "Server busy, analysis not run"
+            }
+        except Exception as e:
+            print(f"Error analysing {filename}: {e}")
+            return {
+                "filename": filename,
+                "error": "Analysis failed"
+            }
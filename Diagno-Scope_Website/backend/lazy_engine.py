@@ -0,0 +1,61 @@
+import time
+import threading
+
+# ==========================================
+# 💤 LAZY ENGINE LOADING
+# ==========================================
+class LazyEngine:
+    """
+    Loads a model/engine on first use instead of at import time.
+
+    `loader` is a zero-argument callable that does the heavy imports and
+    returns the ready engine. `get()` is thread-safe and loads at most once;
+    the load time is kept for the startup report. From async code, go through
+    `call()` on a worker thread (never `get()` on the event loop: the first
+    load imports the framework and reads the weights).
+    """
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.load_seconds = None
+
+        self._engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._engine is not None
+
+    def get(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    print(f"⏳ Loading {self.name} engine...")
+                    started = time.perf_counter()
+                    engine = self.loader()
+                    self.load_seconds = round(time.perf_counter() - started, 3)
+                    self._engine = engine
+                    print(f"✓ {self.name} engine ready in {self.load_seconds:.2f}s")
+        return self._engine
+
+    def call(self, method, *args, **kwargs):
+        """engine.<method>(*args, **kwargs), loading the engine first if needed."""
+        return getattr(self.get(), method)(*args, **kwargs)
+
+    def status(self):
+        return {"loaded": self.loaded, "load_seconds": self.load_seconds}
+
+def parse_allow_list(value, known):
+    """'fracture,dr' -> ['fracture', 'dr']; 'all' -> every known name; '' -> []."""
+    names = [n.strip().lower() for n in (value or "").split(",") if n.strip()]
+    if "all" in names:
+        return list(known)
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        print(f"Warning: unknown engines in preload list ignored: {', '.join(unknown)}")
+    return [n for n in names if n in known]
+
+def preload(engines, allow_list):
+    """Eagerly loads the allow-listed engines (dict name -> LazyEngine)."""
+    for name in parse_allow_list(allow_list, engines.keys()):
+        engines[name].get()
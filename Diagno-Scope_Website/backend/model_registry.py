@@ -0,0 +1,77 @@
+import os
+
+from lazy_engine import LazyEngine, preload as _preload
+from batching import MicroBatcher
+from workers import inference_pool
+from config import BATCH_MAX_SIZE, BATCH_WINDOW_MS
+
+# ==========================================
+# 📚 PROCESS-WIDE MODEL REGISTRY
+# ==========================================
+# Every engine is owned here and loaded at most once per process, so
+# main.py and the per-modality apps (api_fracture / api_tumor / api_dr)
+# share the same read-only weights when they run in one process
+# (`uvicorn main:app` mounts them under /fracture, /tumor and /dr).
+#
+# For several worker processes, load before forking so the weights are
+# shared copy-on-write, e.g.:
+#   DIAGNO_PRELOAD_MODELS=all gunicorn main:app --preload -w 4 -k uvicorn.workers.UvicornWorker
+
+MODEL_WEIGHTS = {
+    "fracture": os.path.abspath("fracture_yolov8.pt"),
+    "tumor": os.path.abspath("brain_tumor_classifier.pt"),
+    "dr": os.path.abspath("best_modeldensenet121.pth"),
+}
+
+# ================= LOADERS =================
+# Heavy imports (ultralytics, torch, grad-cam) happen here only
+def _load_fracture():
+    from fracture_logic import FractureAnalyzer
+    return FractureAnalyzer(MODEL_WEIGHTS["fracture"])
+
+def _load_tumor():
+    from tumor_logic import TumorAnalyzer
+    return TumorAnalyzer(MODEL_WEIGHTS["tumor"])
+
+def _load_dr():
+    from blood import DRAnalyzer
+    return DRAnalyzer(MODEL_WEIGHTS["dr"])
+
+fracture_engine = LazyEngine("Fracture", _load_fracture)
+tumor_engine = LazyEngine("Tumor", _load_tumor)
+dr_engine = LazyEngine("DR", _load_dr)
+
+engines = {
+    "fracture": fracture_engine,
+    "tumor": tumor_engine,
+    "dr": dr_engine,
+}
+
+# ================= BATCHERS =================
+# One queue per engine, shared by every app in the process
+def _fracture_batch(imgs):
+    return fracture_engine.get().run_yolo_batch(imgs)
+
+def _tumor_batch(imgs):
+    return tumor_engine.get().predict_batch(imgs)
+
+def _dr_batch(imgs):
+    return dr_engine.get().predict_batch(imgs)
+
+fracture_batcher = MicroBatcher("fracture", _fracture_batch, BATCH_MAX_SIZE, BATCH_WINDOW_MS, runner=inference_pool.run)
+tumor_batcher = MicroBatcher("tumor", _tumor_batch, BATCH_MAX_SIZE, BATCH_WINDOW_MS, runner=inference_pool.run)
+dr_batcher = MicroBatcher("dr", _dr_batch, BATCH_MAX_SIZE, BATCH_WINDOW_MS, runner=inference_pool.run)
+
+batchers = {
+    "fracture": fracture_batcher,
+    "tumor": tumor_batcher,
+    "dr": dr_batcher,
+}
+
+# ================= HELPERS =================
+def preload(allow_list):
+    """Loads the allow-listed engines now (e.g. "fracture,dr" or "all")."""
+    _preload(engines, allow_list)
+
+def status():
+    return {name: engine.status() for name, engine in engines.items()}
@@ -0,0 +1,115 @@
+import io
+import base64
+import asyncio
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from workers import InferencePool
+from config import REPORT_WORKERS, REPORT_MAX_PENDING
+
+# ==========================================
+# 📄 REPORT RENDERING SERVICE (PROCESS POOL)
+# ==========================================
+# reportlab layout is pure Python and holds the GIL, so PDF builds run on
+# a small pool of worker processes instead of the inference threads (or
+# the event loop). Workers are spawned, not forked: they import only
+# reportlab + report_generator (no torch, OpenCV or models) and build the
+# cached styles and static flowables once, when they start.
+class ReportPool(InferencePool):
+    """
+    InferencePool whose workers are processes (same 503 back-pressure and
+    stats). A worker that dies breaks the whole executor, so it is replaced
+    and the build retried once.
+    """
+    def _make_executor(self):
+        # Only called on the first build, so the API process imports reportlab
+        # when a report is requested, not at startup. The initializer is
+        # pickled by reference: workers import report_generator, not this module
+        from report_generator import warm_up
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_up
+        )
+
+    async def run(self, fn, *args, **kwargs):
+        executor = self._get_executor()
+        try:
+            return await super().run(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            if self._executor is executor: # first caller to notice replaces it
+                print("⚠️ Report worker died, restarting the report pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._make_executor()
+            return await super().run(fn, *args, **kwargs)
+
+report_pool = ReportPool(REPORT_WORKERS, REPORT_MAX_PENDING)
+
+def decode_report_images(images):
+    """
+    Encoded image bytes for every base64 image of a report request (raw or
+    data URL); None for images that do not decode. Only the header is checked.
+    """
+    processed_images = {}
+    for key, b64 in images.items():
+        try:
+            if "," in b64: b64 = b64.split(",")[1]
+            # Fix padding if needed
+            b64 += "=" * ((4 - len(b64) % 4) % 4)
+            img_data = base64.b64decode(b64)
+            # Header check only; reportlab reads the encoded bytes itself
+            with Image.open(io.BytesIO(img_data)) as probe:
+                probe.verify()
+            processed_images[key] = img_data
+        except Exception as e:
+            print(f"Image decode error {key}: {e}")
+            processed_images[key] = None
+    return processed_images
+
+def report_filename(patient_name):
+    """Sanitized download name (nothing is written to disk)."""
+    safe_name = "".join([c for c in patient_name if c.isalnum() or c in "._- "]).strip()
+    return f"Report_{safe_name}.pdf"
+
+async def render(case):
+    """PDF bytes of one case ({patient_data, analysis_data, modality[, report_title]})."""
+    from report_generator import render_report
+    return await report_pool.run(render_report, case)
+
+async def render_bulk(cases, filenames, merge=False):
+    """
+    End-of-day export of many cases: one merged PDF (a single build, one
+    report per page range) or a ZIP of separate PDFs rendered in parallel.
+    Returns (bytes, media_type).
+    """
+    from report_generator import render_merged
+    if merge:
+        return await report_pool.run(render_merged, cases), "application/pdf"
+
+    # At most one build per worker in flight, so a large export does not
+    # hit the pool's pending limit on its own
+    slots = asyncio.Semaphore(report_pool.max_workers)
+    async def render_one(case):
+        async with slots:
+            return await render(case)
+
+    pdfs = await asyncio.gather(*(render_one(case) for case in cases))
+    return await asyncio.to_thread(zip_reports, filenames, pdfs), "application/zip"
+
+def zip_reports(filenames, pdfs):
+    """ZIP archive (stored: PDFs are already compressed) with unique member names."""
+    buffer = io.BytesIO()
+    seen = {}
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for filename, pdf in zip(filenames, pdfs):
+            count = seen.get(filename, 0)
+            seen[filename] = count + 1
+            if count:
+                stem = filename[:-4] if filename.endswith(".pdf") else filename
+                filename = f"{stem}_{count + 1}.pdf"
+            archive.writestr(filename, pdf)
+    return buffer.getvalue()
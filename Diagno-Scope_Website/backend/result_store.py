@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# 🗄️ BOUNDED RESULT STORE (LRU + TTL + DISK SPILL)
+# ==========================================
+UNFINISHED_STATES = ("queued", "running", "partial")
+
+def estimate_size(obj):
+    """Cheap recursive size estimate in bytes (dominated by base64 strings)."""
+    if isinstance(obj, (str, bytes)):
+        return len(obj) + 50
+    if isinstance(obj, dict):
+        return 64 + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return 64 + sum(estimate_size(v) for v in obj)
+    return 16
+
+def is_pinned(record):
+    """Jobs still being filled in must stay in memory (they are mutated in place)."""
+    return isinstance(record, dict) and record.get("status") in UNFINISHED_STATES
+
+class ResultStore:
+    """
+    Dict-like store for job results with a memory budget.
+
+    - Least recently used finished entries are evicted once `max_bytes` is
+      exceeded; unfinished jobs are never evicted.
+    - Entries older than `ttl_seconds` (since their last write) expire.
+    - With `spill_dir` set, entries evicted for memory pressure are written
+      there as JSON and still served by `get` until their TTL runs out.
+
+    Re-assign a record (`store[key] = record`) after mutating it so its size
+    is re-accounted.
+    """
+    DISK_SWEEP_EVERY = 100 # writes between sweeps of expired spill files
+    SPILL_EXT = ".json"
+
+    def __init__(self, name, max_bytes, ttl_seconds, spill_dir=None):
+        self.name = name
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl = ttl_seconds
+        self.spill_dir = os.path.join(spill_dir, name) if spill_dir else None
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+        self._entries = OrderedDict() # key -> (record, size, stored_at)
+        self._bytes = 0
+        self._writes = 0
+        self._lock = threading.RLock()
+
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "spills": 0
+        }
+
+    # ---------- dict interface ----------
+    def __setitem__(self, key, record):
+        with self._lock:
+            self._drop(key)
+            size = estimate_size(record)
+            self._entries[key] = (record, size, time.monotonic())
+            self._bytes += size
+
+            self._evict()
+            self._writes += 1
+            if self.spill_dir and self._writes % self.DISK_SWEEP_EVERY == 0:
+                self._sweep_disk()
+
+    def __getitem__(self, key):
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                record, _, stored_at = entry
+                if self._expired(record, stored_at):
+                    self._drop(key)
+                    self.stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return record
+
+            record = self._load_spilled(key)
+            if record is not None:
+                self.stats["disk_hits"] += 1
+                return record
+
+            self.stats["misses"] += 1
+            return default
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            self._drop(key)
+            self._remove_spilled(key)
+            return entry[0] if entry else default
+
+    # ---------- metrics ----------
+    def snapshot(self):
+        with self._lock:
+            snap = {
+                "entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                **self.stats
+            }
+            if self.spill_dir:
+                snap["disk_entries"] = len(self._spill_files())
+            return snap
+
+    # ---------- internals ----------
+    def _expired(self, record, stored_at):
+        return bool(self.ttl) and not is_pinned(record) and time.monotonic() - stored_at > self.ttl
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self):
+        # 1. Expired entries first
+        for key, (record, _, stored_at) in list(self._entries.items()):
+            if self._expired(record, stored_at):
+                self._drop(key)
+                self.stats["expirations"] += 1
+
+        # 2. Then least recently used finished entries until under budget
+        if self._bytes <= self.max_bytes:
+            return
+        for key, (record, _, stored_at) in list(self._entries.items()):
+            if self._bytes <= self.max_bytes:
+                break
+            if is_pinned(record):
+                continue
+            self._drop(key)
+            self.stats["evictions"] += 1
+            if self.spill_dir:
+                self._spill(key, record, stored_at)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}{self.SPILL_EXT}")
+
+    def _spill_files(self):
+        return [f for f in os.listdir(self.spill_dir) if f.endswith(self.SPILL_EXT)]
+
+    # Spill file format; subclasses storing non-JSON records override both
+    def _serialize(self, record):
+        return json.dumps(record).encode("utf-8")
+
+    def _deserialize(self, data):
+        return json.loads(data)
+
+    def _spill(self, key, record, stored_at):
+        path = self._spill_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            data = self._serialize(record)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            # Keep the original TTL clock: backdate mtime to the write time
+            written_at = time.time() - (time.monotonic() - stored_at)
+            os.utime(path, (written_at, written_at))
+            self.stats["spills"] += 1
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Could not spill {key} from {self.name} store: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load_spilled(self, key):
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(key)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                self.stats["expirations"] += 1
+                return None
+            with open(path, "rb") as f:
+                return self._deserialize(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _remove_spilled(self, key):
+        if self.spill_dir and os.path.exists(self._spill_path(key)):
+            os.remove(self._spill_path(key))
+
+    def _sweep_disk(self):
+        if not self.ttl:
+            return
+        now = time.time()
+        for filename in self._spill_files():
+            path = os.path.join(self.spill_dir, filename)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                    self.stats["expirations"] += 1
+            except OSError:
+                pass
@@ -7,13 +7,27 @@ import os
 from torchvision import transforms
 from torchvision.models import densenet121
 from PIL import Image
-from skimage.filters import frangi
+
+from config import DR_BACKEND, DR_EXPORT_DIR, DR_PARITY_ATOL
+from config import DR_CALIBRATION_DIR, DR_CALIBRATION_LIMIT, DR_INT8_MIN_AGREEMENT
+from config import VESSEL_MAX_SIDE
+from dr_runtime import build_runner, load_calibration_batch
+from vesselness import frangi_vesselness
+from dr_common import percentile_thresholds
+from image_io import read_image
 
 class RetinopathyEngine:
-    def __init__(self, model_path):
+    def __init__(self, model_path, backend=DR_BACKEND):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.classes = ["No DR", "Mild DR", "Moderate DR", "Severe DR", "Proliferative DR"]
         self.model = None
+        self.runner = None
+        self.backend = backend
+        self.transform = transforms.Compose([
+            transforms.Resize((224, 224)),
+            transforms.ToTensor(),
+            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+        ])
         
         # Load Model
         self._load_model(model_path)
@@ -39,26 +53,30 @@ class RetinopathyEngine:
             self.model.to(self.device)
             self.model.eval()
             print("[Engine] Model loaded successfully.")
+
+            # Same optional backends as DRAnalyzer (see dr_runtime.py)
+            calibration = None
+            if self.backend != "eager": # int8 calibration / parity check on real images
+                calibration = load_calibration_batch(DR_CALIBRATION_DIR, self.transform, DR_CALIBRATION_LIMIT)
+            self.runner, self.backend = build_runner(
+                self.model, self.backend, path,
+                export_dir=DR_EXPORT_DIR, atol=DR_PARITY_ATOL,
+                calibration=calibration, min_agreement=DR_INT8_MIN_AGREEMENT
+            )
         else:
             print(f"[Error] Model file not found at {path}")
             # We don't raise error here to prevent app crash, but analysis will fail later
 
     def preprocess(self, image_input):
-        transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
-        ])
-        
         if isinstance(image_input, str):
-            pil_img = Image.open(image_input).convert("RGB")
+            pil_img = Image.fromarray(read_image(image_input))
         elif isinstance(image_input, np.ndarray):
             pil_img = Image.fromarray(image_input)
         else:
             # Assume PIL Image
             pil_img = image_input
             
-        return transform(pil_img).unsqueeze(0).to(self.device)
+        return self.transform(pil_img).unsqueeze(0).to(self.device)
 
     def analyze(self, image_input):
         """
@@ -72,10 +90,14 @@ class RetinopathyEngine:
         if self.model is None:
             return {"error": "Model not loaded"}
 
+        # Paths are decoded once (RGB) and shared by the classifier and the image processing
+        if isinstance(image_input, str):
+            image_input = read_image(image_input)
+
         # 1. AI Prediction
         input_tensor = self.preprocess(image_input)
         with torch.no_grad():
-            logits = self.model(input_tensor)
+            logits = (self.runner or self.model)(input_tensor)
             probs = torch.softmax(logits, dim=1)[0]
         
         pred_idx = probs.argmax().item()
@@ -83,10 +105,7 @@ class RetinopathyEngine:
         diagnosis = self.classes[pred_idx]
 
         # 2. Image Processing (Vessels & Lesions)
-        if isinstance(image_input, str):
-            orig = cv2.imread(image_input)
-            orig = cv2.cvtColor(orig, cv2.COLOR_BGR2RGB)
-        elif isinstance(image_input, np.ndarray):
+        if isinstance(image_input, np.ndarray):
              # Expecting RGB if coming from api logic, or BGR? 
              # api_dr.py sends RGB. 
              orig = image_input.copy()
@@ -100,7 +119,7 @@ class RetinopathyEngine:
         # Vessel Extraction (Frangi)
         clahe = cv2.createCLAHE(2.0, (8,8))
         enhanced = clahe.apply(green)
-        vessels = frangi(enhanced / 255.0)
+        vessels = frangi_vesselness(enhanced / 255.0, max_side=VESSEL_MAX_SIDE)
         vessels = (vessels > 0.04).astype(np.uint8) * 255
         vessels_rgb = cv2.cvtColor(vessels, cv2.COLOR_GRAY2RGB)
 
@@ -112,8 +131,9 @@ class RetinopathyEngine:
         
         # Lesion Analysis (Always run for visualization, but interpret based on classification)
         gray = cv2.GaussianBlur(green, (5,5), 0)
-        _, exudates = cv2.threshold(gray, np.percentile(gray, 95), 255, cv2.THRESH_BINARY)
-        _, hemorrhages = cv2.threshold(gray, np.percentile(gray, 10), 255, cv2.THRESH_BINARY_INV)
+        bright_cut, dark_cut = percentile_thresholds(gray, (95, 10))
+        _, exudates = cv2.threshold(gray, bright_cut, 255, cv2.THRESH_BINARY)
+        _, hemorrhages = cv2.threshold(gray, dark_cut, 255, cv2.THRESH_BINARY_INV)
         
         lesion_mask = cv2.bitwise_or(exudates, hemorrhages)
         kernel = np.ones((5,5), np.uint8)
@@ -0,0 +1,48 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from image_io import img_to_base64
+
+@pytest.fixture
+def client(monkeypatch):
+    """main (single-process mode) with a model-free tumor analysis."""
+    import main
+    import api_tumor
+
+    async def analyze_image(analysis_type, filename, img, encoding=None):
+        return {"filename": filename, "detections_image": img_to_base64(img), "confidence": 0.5}
+
+    monkeypatch.setattr(api_tumor, "analyze_image", analyze_image)
+    monkeypatch.setattr(api_tumor.inference_cache, "enabled", False)
+    with TestClient(main.app) as client:
+        yield client
+
+def wait_for(client, url):
+    for _ in range(200):
+        job = client.get(url).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"{url} did not finish")
+
+def test_artifacts_of_a_mounted_app_are_served_under_its_prefix(client):
+    png = cv2.imencode(".png", np.full((8, 8, 3), 200, np.uint8))[1].tobytes()
+    job_id = client.post("/tumor/analyze", data={"analysis_type": "tumor"},
+                         files=[("files", ("a.png", png, "image/png"))]).json()["job_id"]
+
+    job = wait_for(client, f"/tumor/result/{job_id}")
+    reference = job["results"][0]["detections_image"]
+    assert reference["url"] == f"/tumor/result/{job_id}/artifact/0-detections_image"
+
+    artifact = client.get(reference["url"])
+    assert artifact.status_code == 200
+    assert artifact.headers["content-type"] == "image/png"
+    decoded = cv2.imdecode(np.frombuffer(artifact.content, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (8, 8, 3)
+
+    # main's own artifact store does not hold it
+    assert client.get(f"/result/{job_id}/artifact/0-detections_image").status_code == 404
@@ -0,0 +1,90 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from artifact_store import ArtifactStore, sniff_media_type
+
+def png_bytes(value=0):
+    return cv2.imencode(".png", np.full((4, 4, 3), value, np.uint8))[1].tobytes()
+
+def b64(data):
+    return base64.b64encode(data).decode()
+
+@pytest.fixture
+def store():
+    return ArtifactStore("test_artifacts", 1 << 20, 3600)
+
+def test_media_type_is_sniffed():
+    assert sniff_media_type(png_bytes()) == "image/png"
+    assert sniff_media_type(cv2.imencode(".jpg", np.zeros((4, 4, 3), np.uint8))[1].tobytes()) == "image/jpeg"
+    assert sniff_media_type(b"????") == "application/octet-stream"
+
+def test_response_sends_etag_and_cache_headers(store):
+    data = png_bytes()
+    ref = store.put("job", "0-detections_image", data)
+    assert ref == {
+        "artifact": "0-detections_image",
+        "url": "/result/job/artifact/0-detections_image",
+        "media_type": "image/png",
+        "bytes": len(data)
+    }
+
+    response = store.response("job", "0-detections_image")
+    assert response.status_code == 200
+    assert response.body == data
+    assert response.headers["etag"].startswith('"')
+    assert "immutable" in response.headers["cache-control"]
+    assert "max-age=3600" in response.headers["cache-control"]
+
+def test_matching_etag_gets_304(store):
+    store.put("job", "img", png_bytes())
+    etag = store.response("job", "img").headers["etag"]
+
+    assert store.response("job", "img", if_none_match=etag).status_code == 304
+    assert store.response("job", "img", if_none_match=f'"stale", {etag}').status_code == 304
+    assert store.response("job", "img", if_none_match='"stale"').status_code == 200
+
+def test_etag_follows_content(store):
+    store.put("job", "a", png_bytes(0))
+    store.put("job", "b", png_bytes(255))
+    store.put("job", "c", png_bytes(0))
+    etag = lambda name: store.response("job", name).headers["etag"]
+    assert etag("a") != etag("b")
+    assert etag("a") == etag("c")
+
+def test_unknown_artifact_is_404(store):
+    with pytest.raises(HTTPException) as error:
+        store.response("job", "missing")
+    assert error.value.status_code == 404
+
+def test_externalize_replaces_images_with_references(store):
+    image = b64(png_bytes(10))
+    response = {
+        "filename": "a.png",
+        "detections_image": image,
+        "confidence": 0.8,
+        "details": {"mask_base64": image, "note": "kept"},
+        "outputs": {"clahe": b64(png_bytes(20)), "empty": ""}
+    }
+    out = store.externalize("job", 0, response)
+
+    assert out["confidence"] == 0.8 and out["details"]["note"] == "kept"
+    assert out["detections_image"]["url"] == "/result/job/artifact/0-detections_image"
+    # Identical images in one response are stored once
+    assert out["details"]["mask_base64"] == out["detections_image"]
+    assert out["outputs"]["clahe"]["artifact"] == "0-outputs.clahe"
+    assert out["outputs"]["empty"] == ""
+    assert store.get_artifact("job", "0-outputs.clahe")["data"] == png_bytes(20)
+    assert response["detections_image"] == image # input untouched (may be cached)
+
+def test_spilled_artifacts_are_raw_files(tmp_path):
+    data = png_bytes()
+    store = ArtifactStore("test_artifacts", 1, 3600, str(tmp_path))
+    store.put("job", "img", data)
+
+    assert (tmp_path / "test_artifacts" / "job.img.bin").read_bytes() == data
+    record = store.get_artifact("job", "img")
+    assert record["data"] == data and record["media_type"] == "image/png"
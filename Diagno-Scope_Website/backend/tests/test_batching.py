@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from batching import MicroBatcher
+
+def test_outputs_go_back_to_their_callers():
+    calls = []
+    def batch_fn(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def main():
+        batcher = MicroBatcher("test", batch_fn, max_batch_size=8, window_ms=20)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5))), batcher.stats
+
+    outputs, stats = asyncio.run(main())
+    assert outputs == [0, 10, 20, 30, 40]
+    assert calls == [[0, 1, 2, 3, 4]] # one forward pass for the whole burst
+    assert stats == {"requests": 5, "batches": 1, "largest_batch": 5}
+
+def test_batches_never_exceed_max_batch_size():
+    sizes = []
+    def batch_fn(items):
+        sizes.append(len(items))
+        return list(items)
+
+    async def main():
+        batcher = MicroBatcher("test", batch_fn, max_batch_size=3, window_ms=20)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+
+    assert asyncio.run(main()) == list(range(7))
+    assert max(sizes) <= 3
+    assert sum(sizes) == 7
+
+def test_runner_executes_the_batch():
+    ran = []
+    async def runner(fn, items):
+        ran.append(len(items))
+        return fn(items)
+
+    async def main():
+        batcher = MicroBatcher("test", lambda items: [-i for i in items], window_ms=5, runner=runner)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    assert asyncio.run(main()) == [-1, -2]
+    assert sum(ran) == 2
+
+def test_batch_error_reaches_every_caller():
+    def batch_fn(items):
+        raise RuntimeError("boom")
+
+    async def main():
+        batcher = MicroBatcher("test", batch_fn, window_ms=5)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_wrong_number_of_outputs_fails_every_caller():
+    async def main():
+        batcher = MicroBatcher("test", lambda items: list(items)[:-1], window_ms=20)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), 2
+        )
+
+    results = asyncio.run(main())
+    assert len(results) == 3
+    assert all(isinstance(r, RuntimeError) and "2 outputs for 3 inputs" in str(r) for r in results)
+
+def test_batcher_survives_a_new_event_loop():
+    batcher = MicroBatcher("test", lambda items: [i + 1 for i in items], window_ms=1)
+    # TestClient / uvicorn --reload can hand the batcher a fresh loop
+    assert asyncio.run(batcher.submit(1)) == 2
+    assert asyncio.run(batcher.submit(2)) == 3
+
+def test_cancelled_caller_is_skipped():
+    seen = []
+    def batch_fn(items):
+        seen.extend(items)
+        return list(items)
+
+    async def main():
+        batcher = MicroBatcher("test", batch_fn, window_ms=30)
+        cancelled = asyncio.ensure_future(batcher.submit("gone"))
+        kept = asyncio.ensure_future(batcher.submit("kept"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept
+
+    assert asyncio.run(main()) == "kept"
+    assert seen == ["kept"]
@@ -0,0 +1,90 @@
+import asyncio
+import io
+import types
+
+import cv2
+import numpy as np
+
+from conftest import dicom_bytes
+from dicom_io import DicomFile, as_file, is_dicom, spool_upload
+from image_io import iter_series
+
+class FakeUpload:
+    """The parts of FastAPI's UploadFile spool_upload uses."""
+    def __init__(self, data):
+        self.file = io.BytesIO(data)
+
+    async def seek(self, offset):
+        self.file.seek(offset)
+
+def test_spool_upload_copies_the_whole_upload_rewound():
+    data = bytes(range(256)) * 5000 # > one chunk
+    upload = FakeUpload(data)
+    upload.file.read(100) # already partly read by the framework
+
+    spool = asyncio.run(spool_upload(upload, chunk_size=4096))
+    try:
+        assert spool.tell() == 0
+        assert spool.read() == data
+    finally:
+        spool.close()
+
+def test_spooled_upload_outlives_the_request_file():
+    data = dicom_bytes(np.zeros((4, 4), np.uint8))
+    upload = FakeUpload(data)
+    spool = asyncio.run(spool_upload(upload))
+    upload.file.close()
+
+    fp = as_file(spool)
+    assert is_dicom("upload.bin", fp)
+    assert DicomFile(fp, "upload.bin").rows == 4
+    spool.close()
+
+def test_header_is_read_without_pixel_data():
+    pixels = np.arange(3 * 5 * 6, dtype=np.uint16).reshape(3, 5, 6)
+    dicom = DicomFile(io.BytesIO(dicom_bytes(pixels)), "ct.dcm")
+
+    assert "PixelData" not in dicom.header
+    assert (dicom.frame_count, dicom.rows, dicom.cols) == (3, 5, 6)
+
+def test_frames_are_decoded_one_at_a_time():
+    pixels = np.arange(3 * 5 * 6, dtype=np.uint16).reshape(3, 5, 6)
+    dicom = DicomFile(io.BytesIO(dicom_bytes(pixels)), "ct.dcm")
+
+    frames = dicom.frames()
+    assert isinstance(frames, types.GeneratorType)
+    first = next(frames)
+    assert first.shape == (5, 6)
+    np.testing.assert_array_equal(first, pixels[0])
+    for expected, frame in zip(pixels[1:], frames):
+        np.testing.assert_array_equal(frame, expected)
+    np.testing.assert_array_equal(dicom.frame(2), pixels[2])
+
+def test_iter_series_orders_by_series_and_instance_number():
+    def slice_(value, instance, series="1.2.3"):
+        pixels = np.full((4, 4), value, np.uint8)
+        return dicom_bytes(pixels, SeriesInstanceUID=series, InstanceNumber=instance)
+
+    ok, png = cv2.imencode(".png", np.zeros((4, 4, 3), np.uint8))
+    uploads = [
+        ("photo.png", png.tobytes()),
+        ("c.dcm", slice_(30, 3)),
+        ("other.dcm", slice_(90, 1, series="1.2.4")),
+        ("a.dcm", slice_(10, 1)),
+        ("multi.dcm", dicom_bytes(np.full((2, 4, 4), 50, np.uint8), SeriesInstanceUID="1.2.3", InstanceNumber=2)),
+        ("notes.txt", b"not an image"),
+    ]
+
+    labels = [label for label, _ in iter_series(uploads)]
+    assert labels == ["a.dcm", "multi.dcm#1", "multi.dcm#2", "c.dcm", "other.dcm", "photo.png", "notes.txt"]
+
+def test_iter_series_yields_rgb_frames_and_none_for_unreadable_files():
+    uploads = [
+        ("a.dcm", dicom_bytes(np.full((4, 4), 10, np.uint8), InstanceNumber=1)),
+        ("notes.txt", b"not an image"),
+    ]
+
+    (_, image), (_, broken) = list(iter_series(uploads))
+    assert image.shape == (4, 4, 3) and image.dtype == np.uint8
+    assert (image == 10).all() # 8-bit without rescale / window: identity
+    assert broken is None
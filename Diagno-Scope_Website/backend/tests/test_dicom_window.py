@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pytest
+from pydicom.dataset import Dataset
+
+from conftest import dicom_bytes
+from dicom_io import DicomFile
+from dicom_window import WindowLUT, normalize_to_uint8
+
+def header(**attributes):
+    ds = Dataset()
+    ds.BitsAllocated = 16
+    ds.PixelRepresentation = 0
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    for name, value in attributes.items():
+        setattr(ds, name, value)
+    return ds
+
+def reference_window(frame, slope, intercept, center, width, exact=False):
+    """Per-pixel float pipeline the tables replace: rescale, then VOI window."""
+    values = frame.astype(np.float64) * slope + intercept
+    if exact:
+        out = ((values - center) / width + 0.5) * 255.0
+    else:
+        out = ((values - (center - 0.5)) / (width - 1.0) + 0.5) * 255.0
+    return (np.clip(out, 0, 255) + 0.5).astype(np.uint8)
+
+@pytest.fixture
+def ct_frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(-2048, 3000, size=(32, 48)).astype(np.int16)
+
+def test_signed_rescaled_window_matches_the_float_pipeline(ct_frame):
+    lut = WindowLUT.from_header(header(PixelRepresentation=1, RescaleSlope=1.5, RescaleIntercept=-1024,
+                                       WindowCenter=40, WindowWidth=400))
+
+    np.testing.assert_array_equal(lut.apply(ct_frame), reference_window(ct_frame, 1.5, -1024, 40, 400))
+
+def test_signed_values_are_not_read_as_large_unsigned_ones():
+    lut = WindowLUT.from_header(header(PixelRepresentation=1, WindowCenter=0, WindowWidth=100))
+
+    out = lut.apply(np.array([[-2048, -1, 0, 2999]], np.int16))
+    assert out.tolist() == [[0, 126, 129, 255]]
+
+def test_unsigned_16_bit_window(ct_frame):
+    frame = (ct_frame.astype(np.int32) + 2048).astype(np.uint16)
+    lut = WindowLUT.from_header(header(RescaleSlope=1, RescaleIntercept=-1024, WindowCenter=300, WindowWidth=1500))
+
+    np.testing.assert_array_equal(lut.apply(frame), reference_window(frame, 1, -1024, 300, 1500))
+
+def test_no_window_stretches_the_sample_frame(ct_frame):
+    lut = WindowLUT.from_header(header(PixelRepresentation=1, RescaleSlope=2, RescaleIntercept=-100), sample_frame=ct_frame)
+
+    values = ct_frame.astype(np.float64) * 2 - 100
+    lo, hi = values.min(), values.max()
+    assert lut.window == ((lo + hi) / 2, hi - lo)
+    out = lut.apply(ct_frame)
+    np.testing.assert_array_equal(out, reference_window(ct_frame, 2, -100, (lo + hi) / 2, hi - lo, exact=True))
+    assert out.min() == 0 and out.max() == 255
+
+def test_no_window_and_no_sample_frame_gives_no_table():
+    assert WindowLUT.from_header(header()) is None
+
+def test_8_bit_without_rescale_or_window_is_identity():
+    frame = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    lut = WindowLUT.from_header(header(BitsAllocated=8))
+
+    np.testing.assert_array_equal(lut.apply(frame), frame)
+
+def test_monochrome1_is_inverted(ct_frame):
+    attributes = dict(PixelRepresentation=1, WindowCenter=40, WindowWidth=400)
+    normal = WindowLUT.from_header(header(**attributes))
+    inverted = WindowLUT.from_header(header(PhotometricInterpretation="MONOCHROME1", **attributes))
+
+    np.testing.assert_array_equal(inverted.apply(ct_frame), 255 - normal.apply(ct_frame))
+
+def test_frames_no_table_covers_are_min_max_stretched():
+    lut = WindowLUT.from_header(header(WindowCenter=40, WindowWidth=400))
+    floats = np.linspace(-1.0, 1.0, 12, dtype=np.float32).reshape(3, 4)
+    small = np.arange(12, dtype=np.uint8).reshape(3, 4) # 8-bit frame, 16-bit header
+
+    np.testing.assert_array_equal(lut.apply(floats), normalize_to_uint8(floats))
+    np.testing.assert_array_equal(lut.apply(small), small)
+    assert WindowLUT.from_header(header(BitsAllocated=32)) is None
+
+def test_display_frame_uses_the_file_header(ct_frame):
+    data = dicom_bytes(ct_frame, RescaleSlope=1.5, RescaleIntercept=-1024, WindowCenter=40, WindowWidth=400)
+    rgb = DicomFile(io.BytesIO(data), "ct.dcm").display_frame()
+
+    expected = reference_window(ct_frame, 1.5, -1024, 40, 400)
+    np.testing.assert_array_equal(rgb, np.dstack([expected] * 3))
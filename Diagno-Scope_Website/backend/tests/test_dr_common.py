@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from dr_common import fit_long_side, percentile_thresholds
+
+@pytest.mark.parametrize("seed", range(5))
+def test_percentiles_match_numpy(seed):
+    rng = np.random.default_rng(seed)
+    shape = tuple(int(n) for n in rng.integers(1, 300, 2))
+    img = rng.integers(0, 256, shape, dtype=np.uint8)
+    percentiles = (0, 10, 33.3, 50, 95, 99.9, 100)
+    np.testing.assert_allclose(percentile_thresholds(img, percentiles), np.percentile(img, percentiles))
+
+def test_percentiles_of_skewed_and_constant_images():
+    dark = np.zeros((64, 64), np.uint8)
+    dark[:2] = 255
+    np.testing.assert_allclose(percentile_thresholds(dark, (10, 95, 99)), np.percentile(dark, (10, 95, 99)))
+    flat = np.full((5, 7), 42, np.uint8)
+    np.testing.assert_allclose(percentile_thresholds(flat, (0, 50, 100)), [42, 42, 42])
+
+def test_fit_long_side():
+    img = np.zeros((300, 120, 3), np.uint8)
+    assert fit_long_side(img, 0) is img
+    assert fit_long_side(img, 300) is img
+    assert fit_long_side(img, 150).shape == (150, 60, 3)
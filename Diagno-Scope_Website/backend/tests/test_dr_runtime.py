@@ -0,0 +1,48 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import dr_runtime
+from dr_runtime import build_runner
+
+class Classifier(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.head = torch.nn.Sequential(torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(3, 5))
+
+    def forward(self, batch):
+        return self.head(batch)
+
+class DriftsOnBrightImages:
+    """Matches the model on the random parity inputs, not on real (0-1 range) ones."""
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, batch):
+        logits = self.model(batch)
+        return logits + 10 * (batch.mean() > 0.25)
+
+@pytest.fixture
+def model():
+    return Classifier().eval()
+
+@pytest.fixture
+def drifting_backend(monkeypatch):
+    monkeypatch.setattr(dr_runtime, "build_torchscript", lambda model, path: DriftsOnBrightImages(model))
+    monkeypatch.setattr(dr_runtime, "weights_fingerprint", lambda path: "fp")
+
+def test_random_inputs_alone_miss_the_drift(model, drifting_backend):
+    runner, backend = build_runner(model, "torchscript", "model.pth")
+    assert backend == "torchscript"
+
+def test_sample_images_catch_the_drift(model, drifting_backend):
+    samples = torch.rand(4, *dr_runtime.INPUT_SHAPE)
+    runner, backend = build_runner(model, "torchscript", "model.pth", calibration=samples)
+    assert (runner, backend) == (model, "eager")
+
+def test_matching_backend_passes_on_sample_images(model, monkeypatch):
+    monkeypatch.setattr(dr_runtime, "build_torchscript", lambda model, path: model)
+    monkeypatch.setattr(dr_runtime, "weights_fingerprint", lambda path: "fp")
+    samples = torch.rand(4, *dr_runtime.INPUT_SHAPE)
+    assert build_runner(model, "torchscript", "model.pth", calibration=samples)[1] == "torchscript"
@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+import pytest
+
+from filter_bank import FilterBank, blur_pyramid, pyramid_gaussian, pyramid_level
+from filter_bank_bench import reference_filters, synthetic_radiograph
+
+@pytest.fixture(scope="module")
+def radiograph():
+    return synthetic_radiograph(width=320, height=400, seed=1)
+
+@pytest.fixture(scope="module")
+def reference(radiograph):
+    return reference_filters(radiograph) # full-resolution sigma-250 blur: slow
+
+def max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+def test_variants_match_the_per_variant_filters(radiograph, reference):
+    variants = FilterBank().apply(radiograph)
+
+    assert list(variants) == list(reference)
+    for name in ("original", "brightness", "clahe", "jet_colormap"):
+        assert np.array_equal(variants[name], reference[name]), name
+    assert variants["retinex"].shape == reference["retinex"].shape
+
+def test_full_resolution_retinex_matches(radiograph, reference):
+    # min_sigma=0 disables the pyramid: only float rounding differs
+    variants = FilterBank(min_sigma=0).apply(radiograph)
+    assert max_diff(variants["retinex"], reference["retinex"]) <= 1
+
+def test_pyramid_retinex_stays_close(radiograph, reference):
+    retinex = FilterBank(min_sigma=4).apply(radiograph)["retinex"]
+    diff = np.abs(retinex.astype(np.int16) - reference["retinex"].astype(np.int16))
+    assert diff.mean() < 2
+    assert diff.max() <= 4
+
+def test_pyramid_level():
+    assert pyramid_level(250, 0) == 0
+    assert pyramid_level(3, 4) == 0
+    assert pyramid_level(15, 4) == 1 # 15/2 >= 4, 15/4 < 4
+    assert pyramid_level(250, 4) == 5
+
+def test_blur_pyramid_halves_each_level():
+    pyramid = blur_pyramid(np.zeros((101, 64), np.uint8), 3)
+    assert [p.shape for p in pyramid] == [(101, 64), (51, 32), (26, 16), (13, 8)]
+    assert all(p.dtype == np.float32 for p in pyramid)
+
+def test_pyramid_gaussian_approximates_a_full_blur():
+    rng = np.random.default_rng(0)
+    img = cv2.GaussianBlur(rng.integers(0, 256, (256, 256)).astype(np.uint8), (0, 0), 3)
+    pyramid = blur_pyramid(img, 4)
+    full = cv2.GaussianBlur(pyramid[0], (0, 0), 40)
+    approx = pyramid_gaussian(pyramid, 40, min_sigma=4)
+    assert approx.shape == full.shape
+    assert np.abs(approx - full).mean() < 1.0
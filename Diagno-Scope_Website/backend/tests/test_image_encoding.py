@@ -0,0 +1,123 @@
+import cv2
+import numpy as np
+import pytest
+
+import image_io
+from image_io import ARTIFACT_KINDS, EncodingPolicy, ImageEncoding, encode_image, request_encoding
+
+@pytest.fixture(autouse=True)
+def operator_default(monkeypatch):
+    # Independent of DIAGNO_IMAGE_ENCODING in the test environment
+    monkeypatch.setattr(image_io, "default_encoding", EncodingPolicy.parse(""))
+
+def image(shape=(40, 60, 3)):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=shape, dtype=np.uint8)
+
+@pytest.mark.parametrize("spec, expected", [
+    ("png", ("png", None, 0)),
+    ("png:0", ("png", 0, 0)),
+    ("PNG:9", ("png", 9, 0)),
+    (" webp ", ("webp", None, 0)),
+    ("webp:75", ("webp", 75, 0)),
+    ("jpg", ("jpeg", None, 0)),
+    ("jpeg:80@512", ("jpeg", 80, 512)),
+    ("png@256", ("png", None, 256)),
+])
+def test_encoding_spec_is_parsed(spec, expected):
+    encoding = ImageEncoding.parse(spec)
+    assert (encoding.format, encoding.value, encoding.max_side) == expected
+
+@pytest.mark.parametrize("spec", ["gif", "", "png:10", "webp:0", "jpeg:101", "jpeg:high", "png@-1", "png@big"])
+def test_invalid_encoding_spec_is_rejected(spec):
+    with pytest.raises(ValueError):
+        ImageEncoding.parse(spec)
+
+@pytest.mark.parametrize("spec, text", [
+    ("png", "png"),
+    ("PNG:01", "png:1"),
+    ("jpg:80", "jpeg:80"),
+    ("jpeg:80@0", "jpeg:80"),
+    ("webp@512", "webp@512"),
+])
+def test_encoding_text_is_canonical(spec, text):
+    assert str(ImageEncoding.parse(spec)) == text
+    assert str(ImageEncoding.parse(text)) == text # round trip
+
+def test_format_defaults_when_no_value_is_given():
+    assert ImageEncoding.parse("png").params() == [] # OpenCV's default compression
+    assert ImageEncoding.parse("jpeg").params() == [cv2.IMWRITE_JPEG_QUALITY, 90]
+    assert ImageEncoding.parse("webp").params() == [cv2.IMWRITE_WEBP_QUALITY, 101] # lossless
+    assert ImageEncoding.parse("webp:60").params() == [cv2.IMWRITE_WEBP_QUALITY, 60]
+
+@pytest.mark.parametrize("spec, magic", [("png", b"\x89PNG"), ("jpeg", b"\xff\xd8"), ("webp", b"RIFF")])
+def test_encode_writes_the_format(spec, magic):
+    data = ImageEncoding.parse(spec).encode(image()).tobytes()
+    assert data.startswith(magic)
+
+def test_lossless_formats_round_trip():
+    img = image()
+    for spec in ("png", "png:1", "webp"):
+        decoded = cv2.imdecode(ImageEncoding.parse(spec).encode(img), cv2.IMREAD_COLOR)
+        np.testing.assert_array_equal(cv2.cvtColor(decoded, cv2.COLOR_BGR2RGB), img)
+
+def test_max_side_downscales_only_larger_images():
+    decoded = cv2.imdecode(ImageEncoding.parse("png@30").encode(image()), cv2.IMREAD_COLOR)
+    assert decoded.shape[:2] == (20, 30)
+    decoded = cv2.imdecode(ImageEncoding.parse("png@100").encode(image()), cv2.IMREAD_COLOR)
+    assert decoded.shape[:2] == (40, 60)
+
+def test_empty_policy_is_png_for_every_kind():
+    policy = EncodingPolicy.parse("")
+    assert policy.key == "default=png"
+    for kind in ARTIFACT_KINDS:
+        assert str(policy.for_kind(kind)) == "png"
+
+def test_policy_kinds_fall_back_to_default():
+    policy = EncodingPolicy.parse("default=png:1, variants=jpeg:80@768, overlay=webp")
+    assert str(policy.for_kind("variants")) == "jpeg:80@768"
+    assert str(policy.for_kind("overlay")) == "webp"
+    assert str(policy.for_kind("detections")) == "png:1"
+    assert str(policy.for_kind("original")) == "png:1"
+
+def test_bare_encoding_sets_the_default():
+    assert EncodingPolicy.parse("webp").key == EncodingPolicy.parse("default=webp").key == "default=webp"
+
+def test_policy_key_is_stable_across_spellings():
+    # The key is part of inference cache keys: equivalent specs must not change it
+    keys = {
+        EncodingPolicy.parse(spec).key
+        for spec in (
+            "default=png:1,variants=jpeg:80@768",
+            "variants=jpg:80@768,default=png:1",
+            " VARIANTS = JPEG:80@768 , png:01 ",
+        )
+    }
+    assert keys == {"default=png:1,variants=jpeg:80@768"}
+
+def test_later_entries_override_earlier_ones():
+    assert EncodingPolicy.parse("variants=png,variants=jpeg:70").key == "default=png,variants=jpeg:70"
+
+@pytest.mark.parametrize("spec", ["thumbnails=png", "variants=gif", "variants=jpeg:0"])
+def test_invalid_policy_is_rejected(spec):
+    with pytest.raises(ValueError):
+        EncodingPolicy.parse(spec)
+
+def test_request_encoding_overrides_only_the_kinds_it_names(monkeypatch):
+    monkeypatch.setattr(image_io, "default_encoding", EncodingPolicy.parse("png:1,overlay=webp"))
+    assert request_encoding("") is image_io.default_encoding
+    assert request_encoding(None) is image_io.default_encoding
+
+    policy = request_encoding("variants=jpeg:80")
+    assert policy.key == "default=png:1,overlay=webp,variants=jpeg:80"
+    assert image_io.default_encoding.key == "default=png:1,overlay=webp" # not modified
+
+def test_request_encoding_rejects_invalid_specs():
+    with pytest.raises(ValueError):
+        request_encoding("variants=tiff")
+
+def test_encode_image_uses_the_kind_encoding():
+    policy = EncodingPolicy.parse("png,variants=jpeg:80")
+    assert encode_image(image(), "variants", policy).tobytes().startswith(b"\xff\xd8")
+    assert encode_image(image(), "overlay", policy).tobytes().startswith(b"\x89PNG")
+    assert encode_image(image()).tobytes().startswith(b"\x89PNG") # operator default
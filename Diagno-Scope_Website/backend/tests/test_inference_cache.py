@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import config
+import inference_cache
+from inference_cache import InferenceCache, pixel_cache_key, weights_fingerprint
+from image_io import request_encoding
+from workers import InferencePool
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "model.pt"
+    path.write_bytes(b"weights v1")
+    return str(path)
+
+@pytest.fixture
+def cache(weights, monkeypatch):
+    monkeypatch.setattr(inference_cache, "CACHE_DIR", None)
+    cache = InferenceCache("test_cache", {"dr": weights, "normal": weights, "smart": weights})
+    cache.enabled = True
+    return cache
+
+def image(value=0, shape=(8, 6, 3), dtype=np.uint8):
+    return np.full(shape, value, dtype)
+
+def test_key_depends_on_pixels_shape_and_dtype():
+    base = pixel_cache_key(image(), "normal", "fp")
+    assert pixel_cache_key(image(), "normal", "fp") == base
+    assert pixel_cache_key(image(1), "normal", "fp") != base
+    assert pixel_cache_key(image(shape=(6, 8, 3)), "normal", "fp") != base # same bytes, other shape
+    assert pixel_cache_key(image(dtype=np.uint16), "normal", "fp") != base
+
+def test_key_depends_on_type_weights_and_variant():
+    base = pixel_cache_key(image(), "normal", "fp")
+    assert pixel_cache_key(image(), "smart", "fp") != base
+    assert pixel_cache_key(image(), "normal", "other") != base
+    assert pixel_cache_key(image(), "normal", "fp", "jpeg:85") != base
+
+def test_key_ignores_memory_layout():
+    img = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+    fortran = np.asfortranarray(img)
+    assert pixel_cache_key(img, "normal", "fp") == pixel_cache_key(fortran, "normal", "fp")
+
+def test_swapping_weights_changes_the_fingerprint(weights):
+    before = weights_fingerprint(weights)
+    with open(weights, "wb") as f:
+        f.write(b"weights v2, retrained")
+    assert weights_fingerprint(weights) != before
+    assert weights_fingerprint(weights + ".missing") == "missing"
+
+def test_key_depends_on_encoding(cache):
+    assert cache.key(image(), "normal") != cache.key(image(), "normal", request_encoding("jpeg:85"))
+
+def test_key_depends_on_output_settings(cache, monkeypatch):
+    dr = cache.key(image(), "dr")
+    normal = cache.key(image(), "normal")
+    monkeypatch.setattr(config, "DR_BACKEND", "int8")
+    assert cache.key(image(), "dr") != dr
+    assert cache.key(image(), "normal") == normal # not a setting of this type
+    monkeypatch.setattr(config, "DR_ANALYSIS_MAX_SIDE", 512)
+    assert "DR_ANALYSIS_MAX_SIDE=512" in inference_cache.settings_key("dr")
+
+def test_lookup_or_run_caches_successful_responses(cache):
+    calls = []
+    async def analyze_image(analysis_type, filename, img, encoding):
+        calls.append(filename)
+        return {"filename": filename, "confidence": 0.9}
+
+    async def main():
+        pool = InferencePool(max_workers=1, max_pending=4)
+        first = await cache.lookup_or_run(pool, "normal", "a.png", image(), analyze_image)
+        second = await cache.lookup_or_run(pool, "normal", "b.png", image(), analyze_image)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert calls == ["a.png"]
+    assert "cache_hit" not in first
+    assert second == {"filename": "b.png", "confidence": 0.9, "cache_hit": True}
+
+def test_errors_are_not_cached(cache):
+    calls = []
+    async def analyze_image(analysis_type, filename, img, encoding):
+        calls.append(filename)
+        return {"filename": filename, "error": "Could not process image"}
+
+    async def main():
+        pool = InferencePool(max_workers=1, max_pending=4)
+        for name in ("a.png", "b.png"):
+            await cache.lookup_or_run(pool, "normal", name, image(), analyze_image)
+
+    asyncio.run(main())
+    assert calls == ["a.png", "b.png"]
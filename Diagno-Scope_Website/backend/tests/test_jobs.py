@@ -0,0 +1,160 @@
+import io
+import asyncio
+
+import pytest
+
+from jobs import JobRunner
+from result_store import ResultStore
+from workers import PoolOverloaded
+
+def runner(**kwargs):
+    store = ResultStore("test_jobs", 1 << 20, 0)
+    job_runner = JobRunner(store, **kwargs)
+    job_runner.RETRY_DELAY = 0.01
+    return job_runner, store
+
+async def wait_done(store, job_id, timeout=5):
+    async def poll():
+        while store[job_id]["status"] not in ("completed", "failed"):
+            await asyncio.sleep(0.005)
+        return store[job_id]
+    return await asyncio.wait_for(poll(), timeout)
+
+def uploads(*names):
+    return [(name, io.BytesIO(name.encode())) for name in names]
+
+def test_job_goes_through_every_state():
+    job_runner, store = runner()
+
+    async def main():
+        gates = [asyncio.Event(), asyncio.Event()] # one per file
+        seen = []
+        async def process_upload(analysis_type, filename, content):
+            seen.append(store[job_id]["status"])
+            await gates[len(seen) - 1].wait()
+            return {"filename": filename, "content": content.read().decode()}
+
+        files = uploads("a.png", "b.png")
+        job_id = job_runner.submit("normal", files, process_upload)
+        assert store[job_id]["status"] == "queued"
+        assert store[job_id]["total_files"] == 2
+
+        await asyncio.sleep(0.02)
+        assert seen == ["running"]
+        gates[0].set()
+        await asyncio.sleep(0.02)
+        job = store[job_id]
+        assert job["status"] == "partial" and job["completed_files"] == 1
+        assert job["results"] == [{"filename": "a.png", "content": "a.png"}] # readable before the end
+
+        gates[1].set()
+        job = await wait_done(store, job_id)
+        return job, files
+
+    job, files = asyncio.run(main())
+    assert job["status"] == "completed" and job["completed_files"] == 2
+    assert [r["filename"] for r in job["results"]] == ["a.png", "b.png"]
+    assert all(content.closed for _, content in files)
+
+def test_file_errors_do_not_fail_the_job():
+    job_runner, store = runner()
+
+    async def process_upload(analysis_type, filename, content):
+        if filename == "bad.png":
+            raise ValueError("corrupt")
+        return {"filename": filename}
+
+    async def main():
+        job_id = job_runner.submit("normal", uploads("bad.png", "ok.png"), process_upload)
+        return await wait_done(store, job_id)
+
+    job = asyncio.run(main())
+    assert job["status"] == "completed"
+    assert job["results"] == [{"filename": "bad.png", "error": "Analysis failed"}, {"filename": "ok.png"}]
+
+def test_crashed_study_marks_the_job_failed():
+    job_runner, store = runner()
+
+    async def process_study(analysis_type, files):
+        raise RuntimeError("model exploded")
+
+    async def main():
+        files = uploads("s1.dcm", "s2.dcm")
+        job_id = job_runner.submit_study("tumor_study", files, process_study)
+        return await wait_done(store, job_id), files
+
+    job, files = asyncio.run(main())
+    assert job["status"] == "failed" and job["error"] == "model exploded"
+    assert all(content.closed for _, content in files)
+
+def test_study_results_and_summary():
+    job_runner, store = runner()
+
+    async def process_study(analysis_type, files):
+        return {"results": [{"filename": f"slice{i}"} for i in range(3)], "summary": {"tumor_slices": 1}}
+
+    async def main():
+        job_id = job_runner.submit_study("tumor_study", uploads("study.dcm"), process_study)
+        return await wait_done(store, job_id)
+
+    job = asyncio.run(main())
+    assert job["status"] == "completed"
+    assert job["total_files"] == job["completed_files"] == 3 # multi-frame upload expanded
+    assert job["summary"] == {"tumor_slices": 1}
+
+def test_overloaded_pool_is_retried():
+    job_runner, store = runner(overload_timeout=5)
+    attempts = []
+
+    async def process_upload(analysis_type, filename, content):
+        attempts.append(filename)
+        if len(attempts) < 3:
+            raise PoolOverloaded("busy")
+        return {"filename": filename}
+
+    async def main():
+        job_id = job_runner.submit("normal", uploads("a.png"), process_upload)
+        return await wait_done(store, job_id)
+
+    job = asyncio.run(main())
+    assert len(attempts) == 3
+    assert job["status"] == "completed" and job["results"] == [{"filename": "a.png"}]
+
+def test_overload_gives_up_after_the_timeout():
+    job_runner, store = runner(overload_timeout=0.05)
+
+    async def always_busy(*args):
+        raise PoolOverloaded("busy")
+
+    async def main():
+        file_job = job_runner.submit("normal", uploads("a.png"), always_busy)
+        study_job = job_runner.submit_study("tumor_study", uploads("s.dcm"), always_busy)
+        return await wait_done(store, file_job), await wait_done(store, study_job)
+
+    file_job, study_job = asyncio.run(main())
+    assert file_job["status"] == "completed"
+    assert file_job["results"] == [{"filename": "a.png", "error": "Server busy, analysis not run"}]
+    assert study_job["status"] == "failed"
+
+def test_full_queue_rejects_and_closes_uploads():
+    job_runner, store = runner(max_queued=1)
+
+    async def main():
+        release = asyncio.Event()
+        async def process_upload(analysis_type, filename, content):
+            await release.wait()
+            return {"filename": filename}
+
+        first = job_runner.submit("normal", uploads("a.png"), process_upload)
+        rejected = uploads("b.png")
+        with pytest.raises(PoolOverloaded):
+            job_runner.check_capacity()
+        with pytest.raises(PoolOverloaded):
+            job_runner.submit("normal", rejected, process_upload)
+        release.set()
+        await wait_done(store, first)
+        job_runner.check_capacity() # room again once the job finished
+        return rejected
+
+    rejected = asyncio.run(main())
+    assert rejected[0][1].closed
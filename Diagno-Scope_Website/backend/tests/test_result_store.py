@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+import result_store
+from result_store import ResultStore, estimate_size
+
+class FakeClock:
+    """Stands in for result_store.time (monotonic and wall clock move together)."""
+    def __init__(self):
+        self.now = time.time()
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(result_store, "time", fake)
+    return fake
+
+def done(payload):
+    return {"status": "completed", "payload": payload}
+
+def test_least_recently_used_is_evicted_first(clock):
+    size = estimate_size(done("x" * 100))
+    store = ResultStore("test", max_bytes=size * 2, ttl_seconds=0)
+    store["a"] = done("x" * 100)
+    store["b"] = done("x" * 100)
+    assert store.get("a") is not None # "a" is now the most recently used
+    store["c"] = done("x" * 100)
+
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert store.snapshot()["evictions"] == 1
+    assert store.snapshot()["memory_bytes"] <= store.max_bytes
+
+def test_unfinished_jobs_are_never_evicted(clock):
+    store = ResultStore("test", max_bytes=1, ttl_seconds=0)
+    for status in result_store.UNFINISHED_STATES:
+        store[status] = {"status": status, "results": ["x" * 1000]}
+    store["finished"] = done("x" * 1000)
+
+    for status in result_store.UNFINISHED_STATES:
+        assert status in store
+    assert "finished" not in store
+
+def test_entries_expire_after_ttl(clock):
+    store = ResultStore("test", max_bytes=1 << 20, ttl_seconds=60)
+    store["job"] = done("x")
+    store["running"] = {"status": "running"}
+
+    clock.now += 59
+    assert "job" in store
+    clock.now += 2
+    assert store.get("job") is None
+    assert "running" in store # pinned jobs do not expire
+    assert store.snapshot()["expirations"] == 1
+
+def test_rewrite_reaccounts_size(clock):
+    store = ResultStore("test", max_bytes=1 << 20, ttl_seconds=0)
+    store["job"] = {"status": "running", "results": []}
+    small = store.snapshot()["memory_bytes"]
+    store["job"] = {"status": "completed", "results": ["x" * 5000]}
+    assert store.snapshot()["memory_bytes"] == estimate_size(store["job"]) > small
+
+def test_evicted_entries_are_served_from_disk(clock, tmp_path):
+    size = estimate_size(done("x" * 100))
+    store = ResultStore("test", max_bytes=size, ttl_seconds=60, spill_dir=str(tmp_path))
+    store["a"] = done("x" * 100)
+    store["b"] = done("x" * 100)
+
+    assert store.get("a") == done("x" * 100)
+    snapshot = store.snapshot()
+    assert snapshot["spills"] == 1 and snapshot["disk_hits"] == 1 and snapshot["disk_entries"] == 1
+
+    # Spilled entries keep their TTL clock
+    clock.now += 61
+    assert store.get("a") is None
+
+def test_pop_removes_memory_and_disk(clock, tmp_path):
+    store = ResultStore("test", max_bytes=1, ttl_seconds=0, spill_dir=str(tmp_path))
+    store["a"] = done("x") # over budget: spilled to disk right away
+    assert store.snapshot()["disk_entries"] == 1
+    store.pop("a")
+    assert store.get("a") is None
+    assert store.snapshot()["disk_entries"] == 0
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_importing_main_defers_heavy_libraries():
+    # Fresh interpreter: other tests may already have imported these
+    code = (
+        "import sys, main; "
+        "print('heavy:' + ','.join(m for m in ('reportlab', 'torch', 'ultralytics', 'pytorch_grad_cam') if m in sys.modules))"
+    )
+    env = {**os.environ, "DIAGNO_PRELOAD_MODELS": ""}
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "heavy:"
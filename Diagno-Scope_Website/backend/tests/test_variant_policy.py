@@ -0,0 +1,192 @@
+import json
+
+import numpy as np
+import pytest
+
+import fracture_logic
+import variant_policy
+from fracture_logic import FractureAnalyzer, SmartVariants, RAW_VARIANT
+from variant_policy import VariantPolicy, feature_bucket, read_telemetry
+
+NAMES = SmartVariants.NAMES
+FEATURES = {"mean": 0.3, "contrast": 0.25, "edges": 0.02}
+
+def policy(**kwargs):
+    kwargs.setdefault("telemetry_path", None)
+    kwargs.setdefault("min_samples", 3)
+    kwargs.setdefault("explore", 0.0)
+    kwargs.setdefault("top_k", 2)
+    kwargs.setdefault("first_stage", 1)
+    kwargs.setdefault("early_exit_conf", 0.6)
+    return VariantPolicy(**kwargs)
+
+def full_search(p, winner, features=FEATURES, mode="search"):
+    confs = {name: 0.0 for name in NAMES}
+    confs[winner] = 0.9
+    p.record(features, confs, winner, False, mode)
+
+# ---------- planning ----------
+def test_new_bucket_runs_a_staged_search():
+    stages, mode = policy().plan(FEATURES, NAMES)
+    assert mode == "search"
+    assert stages == [list(NAMES[:1]), list(NAMES[1:])]
+
+def test_trusted_bucket_runs_top_k_first_then_the_rest():
+    p = policy()
+    for _ in range(3):
+        full_search(p, "Sharpened")
+    stages, mode = p.plan(FEATURES, NAMES)
+
+    assert mode == "learned"
+    assert stages[0][0] == "Sharpened" and len(stages[0]) == 2
+    # The other variants are still planned, for when the top-k find nothing
+    assert sorted(stages[0] + stages[1]) == sorted(NAMES)
+
+def test_explore_evaluates_every_variant(monkeypatch):
+    p = policy(explore=0.5)
+    for _ in range(3):
+        full_search(p, "Sharpened")
+    monkeypatch.setattr(variant_policy.random, "random", lambda: 0.1)
+    stages, mode = p.plan(FEATURES, NAMES)
+    assert mode == "explore" and len(stages) == 1 and sorted(stages[0]) == sorted(NAMES)
+
+def test_min_samples_zero_never_trusts_a_bucket():
+    p = policy(min_samples=0)
+    for _ in range(5):
+        full_search(p, "Sharpened")
+    assert p.plan(FEATURES, NAMES)[1] == "search"
+
+def test_order_follows_win_rate_per_bucket():
+    p = policy()
+    other = {"mean": 0.9, "contrast": 0.05, "edges": 0.2}
+    for _ in range(5):
+        full_search(p, "Sharpened")
+        full_search(p, "Brightness Boost", features=other)
+    assert p.order(NAMES, feature_bucket(FEATURES))[0] == "Sharpened"
+    assert p.order(NAMES, feature_bucket(other))[0] == "Brightness Boost"
+
+def test_stop_early():
+    p = policy(early_exit_conf=0.6)
+    assert p.stop_early("search", [0.7])
+    assert not p.stop_early("search", [0.5])
+    assert p.stop_early("learned", [0.2]) # any detection ends a learned plan
+    assert not p.stop_early("learned", [0.0, 0.0])
+    assert not p.stop_early("explore", [0.99])
+    assert not policy(early_exit_conf=0).stop_early("search", [0.99])
+
+# ---------- recording ----------
+def test_learned_searches_do_not_update_win_counts():
+    p = policy()
+    for _ in range(3):
+        full_search(p, "Sharpened")
+    for _ in range(10):
+        p.record(FEATURES, {"CLAHE (Enhanced Contrast)": 0.8, "Sharpened": 0.0}, "CLAHE (Enhanced Contrast)", True, "learned")
+
+    counts = p.buckets[feature_bucket(FEATURES)]
+    assert counts.searches == 3
+    assert "CLAHE (Enhanced Contrast)" not in counts.wins
+    snapshot = p.snapshot()
+    assert snapshot["searches"] == 13
+    assert snapshot["modes"] == {"search": 3, "learned": 10}
+    assert snapshot["early_exits"] == 10
+
+def test_early_exit_after_one_variant_is_not_a_win():
+    p = policy()
+    for _ in range(10):
+        p.record(FEATURES, {RAW_VARIANT: 0.9}, RAW_VARIANT, True, "search")
+    p.record(FEATURES, {RAW_VARIANT: 0.2, "Sharpened": 0.7}, "Sharpened", True, "search")
+
+    counts = p.buckets[feature_bucket(FEATURES)]
+    assert counts.searches == 1 # only the run that compared two variants
+    assert counts.wins == {"Sharpened": 1}
+    assert p.overall.evaluated == {RAW_VARIANT: 1, "Sharpened": 1}
+    assert p.plan(FEATURES, NAMES)[1] == "search" # not trusted by one-variant runs
+    assert p.snapshot()["searches"] == 11
+
+def test_telemetry_is_replayed_at_startup(tmp_path):
+    path = str(tmp_path / "telemetry.jsonl")
+    p = policy(telemetry_path=path)
+    for _ in range(3):
+        full_search(p, "Sharpened")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+
+    reloaded = policy(telemetry_path=path)
+    assert reloaded.loaded_records == 3
+    assert reloaded.plan(FEATURES, NAMES)[1] == "learned"
+
+def test_telemetry_file_is_compacted(tmp_path):
+    path = str(tmp_path / "telemetry.jsonl")
+    p = policy(telemetry_path=path, max_records=4)
+    for i in range(11):
+        full_search(p, NAMES[i % len(NAMES)])
+
+    # Cut back to 4 at the 8th record, 3 appended since
+    records = read_telemetry(path)
+    assert len(records) == 7
+    assert [r["winner"] for r in records] == [NAMES[i % len(NAMES)] for i in range(4, 11)]
+    with open(path, encoding="utf-8") as f:
+        assert all(json.loads(line) for line in f)
+
+    # A file larger than max_records is compacted at startup
+    reloaded = policy(telemetry_path=path, max_records=4)
+    assert reloaded.loaded_records == 4
+    assert len(read_telemetry(path)) == 4
+
+# ---------- smart_analyze ----------
+class FakeBoxes:
+    def __init__(self, conf):
+        self.conf = np.array([conf]) if conf > 0 else np.array([])
+
+    def __len__(self):
+        return len(self.conf)
+
+class FakeResult:
+    def __init__(self, conf):
+        self.boxes = FakeBoxes(conf)
+
+    def plot(self):
+        return np.zeros((4, 4, 3), np.uint8)
+
+@pytest.fixture
+def smart(monkeypatch):
+    """FractureAnalyzer without a model: variant i is a flat image of value i, `confs` gives its detection."""
+    p = policy(min_samples=1)
+    monkeypatch.setattr(fracture_logic, "smart_policy", p)
+    monkeypatch.setattr(fracture_logic, "image_features", lambda img: FEATURES)
+    monkeypatch.setattr(SmartVariants, "_build", lambda self, name: np.full((16, 16, 3), NAMES.index(name), np.uint8))
+
+    engine = FractureAnalyzer.__new__(FractureAnalyzer)
+    engine.confs = {}
+    engine.passes = []
+    def run_yolo_batch(imgs):
+        names = [NAMES[int(img[0, 0, 0])] for img in imgs]
+        engine.passes.append(names)
+        return [FakeResult(engine.confs.get(name, 0.0)) for name in names]
+    engine.run_yolo_batch = run_yolo_batch
+    return engine, p
+
+def test_learned_plan_falls_back_when_top_k_detect_nothing(smart):
+    engine, p = smart
+    full_search(p, "Sharpened")
+    engine.confs = {"Brightness Boost": 0.4} # not among the learned top-2
+
+    _, name, conf = engine.smart_analyze(np.zeros((16, 16, 3), np.uint8))
+    assert name == "Brightness Boost" and conf >= 0.4
+    assert len(engine.passes) == 2 and len(engine.passes[0]) == 2
+    assert p.modes["learned"] == 1
+
+def test_learned_plan_stops_after_a_top_k_detection(smart):
+    engine, p = smart
+    full_search(p, "Sharpened")
+    engine.confs = {"Sharpened": 0.3, "Brightness Boost": 0.9}
+
+    _, name, _ = engine.smart_analyze(np.zeros((16, 16, 3), np.uint8))
+    assert name == "Sharpened"
+    assert len(engine.passes) == 1
+
+def test_nothing_detected_reports_the_raw_pass(smart):
+    engine, p = smart
+    _, name, conf = engine.smart_analyze(np.zeros((16, 16, 3), np.uint8))
+    assert (name, conf) == (RAW_VARIANT, 0.0)
+    assert sum(len(names) for names in engine.passes) == len(NAMES) # every variant was tried
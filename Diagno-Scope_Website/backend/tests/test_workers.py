@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+
+from workers import InferencePool, PoolOverloaded
+
+def test_run_returns_the_result_off_the_event_loop():
+    pool = InferencePool(max_workers=2, max_pending=4)
+    loop_thread = threading.get_ident()
+
+    async def main():
+        return await pool.run(lambda a, b=0: (a + b, threading.get_ident()), 1, b=2)
+
+    result, worker_thread = asyncio.run(main())
+    assert result == 3
+    assert worker_thread != loop_thread
+    assert pool.snapshot()["finished"] == 1
+
+def test_overload_is_rejected_not_queued():
+    pool = InferencePool(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def main():
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.saturated
+        with pytest.raises(PoolOverloaded):
+            await pool.run(lambda: None)
+        release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(main())
+    snapshot = pool.snapshot()
+    assert snapshot["rejected"] == 1
+    assert snapshot["finished"] == 2
+    assert snapshot["pending"] == 0
+
+def test_pending_is_released_when_the_task_fails():
+    pool = InferencePool(max_workers=1, max_pending=1)
+    def fail():
+        raise ValueError("bad input")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        return await pool.run(lambda: "ok") # slot is free again
+
+    assert asyncio.run(main()) == "ok"
+    assert pool.snapshot()["pending"] == 0
+
+def test_executor_is_created_on_first_run():
+    pool = InferencePool(max_workers=1, max_pending=1)
+    assert pool._executor is None
+
+    async def main():
+        return await pool.run(lambda: "ok")
+
+    assert asyncio.run(main()) == "ok"
+    assert pool._executor is not None
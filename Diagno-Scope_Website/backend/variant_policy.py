@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import random
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from config import SMART_EARLY_EXIT_CONF, SMART_FIRST_STAGE
+from config import SMART_POLICY_TOP_K, SMART_POLICY_MIN_SAMPLES, SMART_POLICY_EXPLORE
+from config import SMART_TELEMETRY_PATH, SMART_TELEMETRY_MAX_RECORDS
+
+# ==========================================
+# 🧭 SMART MODE: VARIANT TELEMETRY + LEARNED ORDERING
+# ==========================================
+# Every smart-mode search is recorded with a few cheap statistics of the
+# radiograph (mean intensity, contrast, edge density), the confidence of
+# each variant it evaluated and the winner. Win counts are kept per
+# statistics bucket (with the global counts as a prior), so the policy can
+# predict which variants win for images that look like this one. Searches
+# that ran the learned plan are not counted (see _add).
+# With SMART_TELEMETRY_PATH set, records are appended there as JSON lines
+# and replayed at startup; variant_replay.py measures offline how the
+# learned policy trades accuracy for YOLO passes.
+FEATURE_SIDE = 256 # features are computed on a copy this size (long side)
+BUCKET_EDGES = {
+    "mean": (0.2, 0.4, 0.6),
+    "contrast": (0.1, 0.2, 0.3),
+    "edges": (0.01, 0.03, 0.08)
+}
+BUCKET_PRIOR = 5.0 # pseudo-searches of global win rate mixed into each bucket
+
+def image_features(img):
+    """Mean intensity, contrast (std) and Canny edge density of an RGB image, 0-1."""
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY) if img.ndim == 3 else img
+    h, w = gray.shape[:2]
+    scale = FEATURE_SIDE / max(h, w)
+    if scale < 1:
+        gray = cv2.resize(gray, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+    mean, std = cv2.meanStdDev(gray)
+    edges = cv2.Canny(gray, 100, 200)
+    return {
+        "mean": round(float(mean[0][0]) / 255.0, 4),
+        "contrast": round(float(std[0][0]) / 255.0, 4),
+        "edges": round(float(np.count_nonzero(edges) / edges.size), 4)
+    }
+
+def feature_bucket(features):
+    """Coarse bucket key of image_features(), e.g. 'm1-c2-e0'."""
+    return "-".join(
+        f"{name[0]}{int(np.digitize(features[name], edges))}"
+        for name, edges in BUCKET_EDGES.items()
+    )
+
+class WinCounts:
+    """How often each variant was evaluated / won, over `searches` searches."""
+    def __init__(self):
+        self.searches = 0
+        self.evaluated = {}
+        self.wins = {}
+
+    def add(self, evaluated, winner):
+        self.searches += 1
+        for name in evaluated:
+            self.evaluated[name] = self.evaluated.get(name, 0) + 1
+        if winner is not None:
+            self.wins[winner] = self.wins.get(winner, 0) + 1
+
+    def win_rate(self, name, prior_rate=0.5, prior=2.0):
+        """Wins per evaluation, smoothed towards `prior_rate` by `prior` pseudo-evaluations."""
+        return (self.wins.get(name, 0) + prior * prior_rate) / (self.evaluated.get(name, 0) + prior)
+
+class VariantPolicy:
+    """
+    Process-wide smart-mode statistics and search plans.
+
+    plan() returns the batches of variants to run:
+    - "learned": buckets with at least `min_samples` searches run the
+      `top_k` variants that win most often for that bucket first, and the
+      rest only if none of those detected anything
+    - "explore": a fraction `explore` of those still evaluates every
+      variant, so the statistics of the skipped ones keep improving
+    - "search": otherwise, the `first_stage` best variants first and the
+      rest only if none reached `early_exit_conf` (0 = no early exit)
+    """
+    def __init__(self, top_k=SMART_POLICY_TOP_K, min_samples=SMART_POLICY_MIN_SAMPLES,
+                 explore=SMART_POLICY_EXPLORE, first_stage=SMART_FIRST_STAGE,
+                 early_exit_conf=SMART_EARLY_EXIT_CONF, telemetry_path=SMART_TELEMETRY_PATH,
+                 max_records=SMART_TELEMETRY_MAX_RECORDS):
+        self.top_k = top_k
+        self.min_samples = min_samples
+        self.explore = explore
+        self.first_stage = first_stage
+        self.early_exit_conf = early_exit_conf
+        self.telemetry_path = telemetry_path
+        self.max_records = max_records
+
+        self._lock = threading.Lock()
+        self.overall = WinCounts()
+        self.buckets = {}
+        self.searches = 0
+        self.early_exits = 0
+        self.yolo_passes = 0
+        self.modes = {}
+        self.loaded_records = 0
+        self._file_records = 0
+
+        if telemetry_path:
+            self.load(telemetry_path)
+
+    # ---------- planning ----------
+    def order(self, names, bucket=None):
+        """`names` by descending win rate in `bucket` (global rate if unknown; ties keep the given order)."""
+        with self._lock:
+            return self._order(names, bucket)
+
+    def _order(self, names, bucket):
+        counts = self.buckets.get(bucket)
+        def score(name):
+            overall = self.overall.win_rate(name)
+            return counts.win_rate(name, overall, BUCKET_PRIOR) if counts else overall
+        return sorted(names, key=score, reverse=True)
+
+    def plan(self, features, names):
+        """(list of variant batches, mode) for an image with these image_features()."""
+        bucket = feature_bucket(features)
+        with self._lock:
+            order = self._order(names, bucket)
+            trusted = self._trusted(self.buckets.get(bucket))
+
+        if trusted and random.random() >= self.explore:
+            return [order[:self.top_k], order[self.top_k:]], "learned"
+        if trusted:
+            return [order], "explore"
+        return [order[:self.first_stage], order[self.first_stage:]], "search"
+
+    def _trusted(self, counts):
+        """True if a bucket's WinCounts hold enough searches for the learned plan."""
+        return self.min_samples > 0 and counts is not None and counts.searches >= self.min_samples
+
+    def stop_early(self, mode, confs):
+        """
+        True if the remaining batches can be skipped after a batch with these
+        confidences: a "learned" plan once it detected anything, a "search"
+        plan once a variant reached `early_exit_conf`.
+        """
+        best = max(confs, default=0.0)
+        if mode == "learned":
+            return best > 0
+        return mode == "search" and self.early_exit_conf > 0 and best >= self.early_exit_conf
+
+    # ---------- recording ----------
+    def record(self, features, confs, winner, early_exit=False, mode="search"):
+        """
+        One finished search: `confs` maps each evaluated variant to its max
+        confidence, `winner` is the picked variant (None without detection).
+        """
+        entry = {
+            "ts": round(time.time(), 3),
+            "features": features,
+            "mode": mode,
+            "confs": {name: round(float(conf), 4) for name, conf in confs.items()},
+            "winner": winner,
+            "early_exit": early_exit
+        }
+        with self._lock:
+            self._add(entry)
+            if self.telemetry_path:
+                self._append(entry)
+
+    def _add(self, entry):
+        evaluated = list(entry["confs"])
+        # Only searches that compared variants are learned from: "learned"
+        # runs (and searches that exited after a one-variant first stage) only
+        # evaluate what the policy already prefers, so counting their winner
+        # would just reinforce its own choice
+        if entry["mode"] != "learned" and len(evaluated) > 1:
+            self.overall.add(evaluated, entry["winner"])
+            self.buckets.setdefault(feature_bucket(entry["features"]), WinCounts()).add(evaluated, entry["winner"])
+        self.searches += 1
+        self.early_exits += int(entry["early_exit"])
+        self.yolo_passes += len(evaluated)
+        self.modes[entry["mode"]] = self.modes.get(entry["mode"], 0) + 1
+
+    def _append(self, entry):
+        try:
+            with open(self.telemetry_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._file_records += 1
+            # Only the last `max_records` are ever replayed: once the file
+            # holds twice that, it is cut back to them
+            if self.max_records and self._file_records >= 2 * self.max_records:
+                self._file_records = compact_telemetry(self.telemetry_path, self.max_records)
+        except OSError as e:
+            print(f"⚠️ Smart telemetry write failed: {e}")
+
+    def load(self, path):
+        """Replays the last `max_records` telemetry records of `path` into the counts."""
+        entries = read_telemetry(path, self.max_records)
+        for entry in entries:
+            self._add(entry)
+            self.loaded_records += 1
+        self._file_records = count_lines(path)
+        if self.max_records and self._file_records > self.max_records:
+            try:
+                self._file_records = compact_telemetry(path, self.max_records)
+            except OSError as e:
+                print(f"⚠️ Smart telemetry compaction failed: {e}")
+        if self.loaded_records:
+            print(f"✓ Smart telemetry: {self.loaded_records} searches loaded from {path}")
+
+    def snapshot(self):
+        with self._lock:
+            searches = self.searches
+            return {
+                "searches": searches,
+                "early_exits": self.early_exits,
+                "avg_yolo_passes": round(self.yolo_passes / searches, 2) if searches else 0.0,
+                "modes": dict(self.modes),
+                "buckets": len(self.buckets),
+                "trusted_buckets": sum(1 for c in self.buckets.values() if self._trusted(c)),
+                "telemetry": {"path": self.telemetry_path, "loaded_records": self.loaded_records},
+                "variants": {
+                    name: {
+                        "evaluated": count,
+                        "wins": self.overall.wins.get(name, 0),
+                        "win_rate": round(self.overall.win_rate(name), 3)
+                    }
+                    for name, count in self.overall.evaluated.items()
+                }
+            }
+
+def read_telemetry(path, max_records=None):
+    """Telemetry records of `path` (oldest first, at most the last `max_records`); skips bad lines."""
+    if not os.path.exists(path):
+        return []
+    entries = deque(maxlen=max_records or None)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                if isinstance(entry.get("confs"), dict) and isinstance(entry.get("features"), dict):
+                    entries.append(entry)
+            except ValueError:
+                continue
+    return list(entries)
+
+def count_lines(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+def compact_telemetry(path, max_records):
+    """Rewrites `path` with only its last `max_records` valid records (atomic replace); returns how many."""
+    entries = read_telemetry(path, max_records)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, path)
+    return len(entries)
+
+smart_policy = VariantPolicy()
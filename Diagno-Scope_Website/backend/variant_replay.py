@@ -0,0 +1,115 @@
+"""
+Offline replay of smart-mode telemetry: accuracy vs. YOLO passes of the
+variant search strategies.
+
+    python variant_replay.py smart_telemetry.jsonl [--top-k 1 2 3] [--policy-top-k 2]
+                             [--min-samples 50] [--explore 0.1] [--first-stage 1]
+                             [--early-exit 0.6] [--seed 0]
+
+Records are replayed in order through a fresh VariantPolicy (it learns as
+the service would). Every record that evaluated all variants is also
+scored before it is learned from: each strategy picks its variants from
+the statistics so far, and its choice (highest confidence among them) is
+compared with the full search that was recorded.
+
+- all: every variant (the reference, 5 passes)
+- search: best variants first, the rest unless one reached --early-exit
+- top-k: only the k most frequent winners for the image's bucket
+- policy: the plan VariantPolicy.plan() makes with the service's rules
+  (trust threshold, explore draw seeded by --seed, fallback stage);
+  option defaults are the service's config values
+
+Winner = same variant as the recorded full search (which may have broken
+a near-tie with the edge-density bonus, so "all" can stay below 100%);
+detection = both or neither found something; conf loss = mean drop of the
+best confidence.
+"""
+import random
+import argparse
+
+from config import SMART_POLICY_TOP_K, SMART_POLICY_MIN_SAMPLES, SMART_POLICY_EXPLORE
+from config import SMART_FIRST_STAGE, SMART_EARLY_EXIT_CONF
+from fracture_logic import SmartVariants
+from variant_policy import VariantPolicy, read_telemetry, feature_bucket
+
+def choose(confs, names):
+    """Variant with the highest confidence among `names` (None if nothing was detected)."""
+    best = max(names, key=lambda name: confs[name])
+    return (best, confs[best]) if confs[best] > 0 else (None, 0.0)
+
+def run_plan(policy, stages, mode, confs):
+    """Variants a plan evaluates, given the recorded confidences (stops like smart_analyze)."""
+    evaluated = []
+    for stage in filter(None, stages):
+        evaluated += stage
+        if policy.stop_early(mode, [confs[name] for name in stage]):
+            break
+    return evaluated
+
+def plan_strategies(policy, entry, names, args):
+    """Variants each strategy would evaluate for this record, and the policy's mode."""
+    confs = entry["confs"]
+    order = policy.order(names, feature_bucket(entry["features"]))
+    stages, mode = policy.plan(entry["features"], names)
+
+    plans = {
+        "all": list(names),
+        "search": run_plan(policy, [order[:policy.first_stage], order[policy.first_stage:]], "search", confs)
+    }
+    for k in args.top_k:
+        plans[f"top-{k}"] = order[:k]
+    plans["policy"] = run_plan(policy, stages, mode, confs)
+    return plans, mode
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("telemetry")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--policy-top-k", type=int, default=SMART_POLICY_TOP_K)
+    parser.add_argument("--min-samples", type=int, default=SMART_POLICY_MIN_SAMPLES)
+    parser.add_argument("--explore", type=float, default=SMART_POLICY_EXPLORE)
+    parser.add_argument("--first-stage", type=int, default=SMART_FIRST_STAGE)
+    parser.add_argument("--early-exit", type=float, default=SMART_EARLY_EXIT_CONF)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    names = SmartVariants.NAMES
+    policy = VariantPolicy(
+        top_k=args.policy_top_k, min_samples=args.min_samples, explore=args.explore,
+        first_stage=args.first_stage, early_exit_conf=args.early_exit, telemetry_path=None
+    )
+    scores = {}
+    policy_modes = {}
+    full_records = 0
+
+    entries = read_telemetry(args.telemetry)
+    for entry in entries:
+        if set(entry["confs"]) >= set(names):
+            full_records += 1
+            reference, reference_conf = entry["winner"], max(entry["confs"][n] for n in names)
+            plans, mode = plan_strategies(policy, entry, names, args)
+            policy_modes[mode] = policy_modes.get(mode, 0) + 1
+            for strategy, planned in plans.items():
+                winner, conf = choose(entry["confs"], planned)
+                score = scores.setdefault(strategy, {"winner": 0, "detection": 0, "conf_loss": 0.0, "passes": 0})
+                score["winner"] += int(winner == reference)
+                score["detection"] += int((conf > 0) == (reference_conf > 0))
+                score["conf_loss"] += reference_conf - conf
+                score["passes"] += len(planned)
+
+        policy.record(entry["features"], entry["confs"], entry["winner"], entry.get("early_exit", False), entry.get("mode", "search"))
+
+    print(f"{len(entries)} records, {full_records} full searches scored, {len(policy.buckets)} buckets")
+    if not full_records:
+        return
+    print(f"policy plans: {policy_modes}")
+    print(f"{'strategy':10s} {'winner':>8s} {'detection':>10s} {'conf loss':>10s} {'passes':>7s}")
+    for strategy, score in scores.items():
+        print(
+            f"{strategy:10s} {score['winner'] / full_records:8.1%} {score['detection'] / full_records:10.1%} "
+            f"{score['conf_loss'] / full_records:10.4f} {score['passes'] / full_records:7.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
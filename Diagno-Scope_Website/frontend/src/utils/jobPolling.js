@@ -0,0 +1,19 @@
+/**
+ * Polls GET /result/{jobId} until the backend job has finished.
+ * /analyze only queues the job; status goes queued -> running -> partial -> completed.
+ */
+export async function waitForJob(baseUrl, jobId, { intervalMs = 500, timeoutMs = 5 * 60 * 1000 } = {}) {
+    const startedAt = Date.now();
+
+    while (true) {
+        const response = await fetch(`${baseUrl}/result/${jobId}`);
+        if (!response.ok) throw new Error(`Result fetch failed (${response.status})`);
+
+        const data = await response.json();
+        if (data.status === 'completed') return data;
+        if (data.status === 'failed') throw new Error(data.error || 'Analysis failed');
+
+        if (Date.now() - startedAt > timeoutMs) throw new Error('Analysis timed out');
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
@@ -1,10 +1,17 @@
-
-Write-Host "Starting Multi-Service Backend..."
-$backendPath = Join-Path $PSScriptRoot "backend"
-cd $backendPath
-
-Start-Process uvicorn -ArgumentList "api_fracture:app --host 127.0.0.1 --port 8000 --reload" -WorkingDirectory $backendPath
-Start-Process uvicorn -ArgumentList "api_tumor:app --host 127.0.0.1 --port 8001 --reload" -WorkingDirectory $backendPath
-Start-Process uvicorn -ArgumentList "api_dr:app --host 127.0.0.1 --port 8002 --reload" -WorkingDirectory $backendPath
-Write-Host "Services started on Ports 8000 (Fracture), 8001 (Tumor), 8002 (DR)."
-read-host "Press Enter to exit..."
+param([switch]$Single)
+
+Write-Host "Starting Multi-Service Backend..."
+$backendPath = Join-Path $PSScriptRoot "backend"
+cd $backendPath
+
+if ($Single) {
+    # One process, one copy of each model: /fracture, /tumor and /dr are mounted on main:app
+    Start-Process uvicorn -ArgumentList "main:app --host 127.0.0.1 --port 8000 --reload" -WorkingDirectory $backendPath
+    Write-Host "Single service started on Port 8000 (/fracture, /tumor, /dr)."
+} else {
+    Start-Process uvicorn -ArgumentList "api_fracture:app --host 127.0.0.1 --port 8000 --reload" -WorkingDirectory $backendPath
+    Start-Process uvicorn -ArgumentList "api_tumor:app --host 127.0.0.1 --port 8001 --reload" -WorkingDirectory $backendPath
+    Start-Process uvicorn -ArgumentList "api_dr:app --host 127.0.0.1 --port 8002 --reload" -WorkingDirectory $backendPath
+    Write-Host "Services started on Ports 8000 (Fracture), 8001 (Tumor), 8002 (DR)."
+}
+read-host "Press Enter to exit..."